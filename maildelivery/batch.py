@@ -0,0 +1,156 @@
+'''
+solves many scenarios on a pool of warm planner processes (see brains/planner_pool), streaming one json line
+per scenario as soon as it is solved.
+
+a scenario is a json object:
+    {"name": "city_7", "brain": "bots_and_drones", "backWithCharge": true,
+     "env": {"locations": [{"id": 0, "xy": [0.0, 0.0], "type": "intersection"}, ...],
+             "connectivityList": [[0, 1], ...],
+             "packages": [{"id": 0, "owner": 3, "owner_type": "location", "goal": 7, "deliverytime": 0.0, "xy": [..]}]},
+     "robots": [{"id": 0, "last_location": 20, "goal_location": 20, "velocity": 8.0, "charge": 50.0, "return_charge": 60.0}],
+     "drones": [{"id": 2, "last_location": 5, "velocity": 6.0}],
+     "planner": {"f_dist2charge": "mymodule:discharge", "max_charge": 100.0},
+     "problem": {"reduce_map": true},
+     "options": {"engine_name": "lpg", "deadline": 30.0}}
+planner and problem are the planner_options and problem_options of planner_pool.submit, charge functions given as
+"module:function". options are those of robot_planner.solve. scenario() writes one from live objects.
+
+    python -m maildelivery.batch scenarios.jsonl -o results.jsonl -j 8
+'''
+import argparse
+import importlib
+import json
+import sys
+from concurrent.futures import as_completed
+from types import SimpleNamespace
+from typing import Iterator, TextIO
+
+import numpy as np
+
+from maildelivery.world import enviorment, location, package
+from maildelivery.agents import robot, drone
+from maildelivery.binary_solvers import telemetry
+from maildelivery.binary_solvers.plan_cache import plan_cache
+from maildelivery.binary_solvers.result import solve_error
+from maildelivery.brains.planner_pool import planner_pool, build_planner, check_options, AGENT_FIELDS
+
+PACKAGE_FIELDS = ('id', 'owner', 'owner_type', 'goal', 'deliverytime')
+
+def function_name(f) -> str:
+    #'module:function' of a module level function, the way scenarios name charge functions
+    name = f'{f.__module__}:{f.__qualname__}'
+    if '<' in name:
+        raise ValueError(f'{name} can not be named in a scenario, use a module level function')
+    return name
+
+def load_function(name : str):
+    module, _, qualname = name.partition(':')
+    f = importlib.import_module(module)
+    for attr in qualname.split('.'):
+        f = getattr(f, attr)
+    return f
+
+def scenario(name : str, env : enviorment, robots : list[robot], drones : list[drone] = [], \
+                brain = 'bots_and_drones', backWithCharge = False, planner_options : dict = None, \
+                problem_options : dict = None, **solve_options) -> dict:
+    #json ready scenario of live objects
+    agent = lambda a: {f : getattr(a, f) for f in AGENT_FIELDS if hasattr(a, f)}
+    check_options(brain, planner_options)
+    planner = {k : function_name(v) if callable(v) else v for k, v in (planner_options or {}).items()}
+    return {'name' : name, 'brain' : brain, 'backWithCharge' : backWithCharge,
+            'planner' : planner, 'problem' : dict(problem_options or {}),
+            'env' : {'locations' : [{'id' : l.id, 'xy' : np.asarray(l.xy).tolist(), 'type' : l.type} for l in env.locations],
+                     'connectivityList' : [list(c) for c in env.connectivityList],
+                     'packages' : [dict({f : getattr(p, f) for f in PACKAGE_FIELDS}, xy = np.asarray(p.xy).tolist())
+                                    for p in (env.packages or [])]},
+            'robots' : [agent(r) for r in robots],
+            'drones' : [agent(d) for d in drones],
+            'options' : solve_options}
+
+def load_scenario(s : dict) -> tuple[enviorment, list[SimpleNamespace], list[SimpleNamespace]]:
+    #env, robots and drones of a scenario. agents only carry what the planner reads
+    e = s['env']
+    locations = [location(l['id'], np.array(l['xy']), l['type']) for l in e['locations']]
+    packages = [package(p['id'], p['owner'], p['owner_type'], p['goal'], p['deliverytime'], np.array(p['xy']))
+                for p in e.get('packages', [])]
+    env = enviorment(locations, [tuple(c) for c in e['connectivityList']], packages)
+    return env, [SimpleNamespace(**r) for r in s.get('robots', [])], [SimpleNamespace(**d) for d in s.get('drones', [])]
+
+def _run(index : int, s : dict, cache : plan_cache) -> dict:
+    #in a pool worker. never raises, failures are reported in the result line
+    line = {'index' : index, 'name' : s.get('name', str(index)), 'status' : 'error', 'found' : False,
+            'makespan' : None, 'plan' : None, 'record' : None, 'error' : None}
+    try:
+        env, robots, drones = load_scenario(s)
+        planner_options = {k : load_function(v) if isinstance(v, str) else v for k, v in s.get('planner', {}).items()}
+        check_options(s.get('brain', 'bots_and_drones'), planner_options)
+        planner = build_planner(s.get('brain', 'bots_and_drones'), env, robots, drones, \
+                                s.get('backWithCharge', False), planner_options, s.get('problem', {}))
+        options = dict(s.get('options', {}), cache = cache, telemetry_sink = telemetry.null_sink)
+        try:
+            execution_times, actions, durations = planner.solve(**options)
+            line['plan'] = {'execution_times' : execution_times, 'actions' : [list(a) for a in actions],
+                            'durations' : durations}
+        except solve_error:
+            pass
+        result = planner.last_result
+        line.update(status = result.status, found = result.found, makespan = result.makespan, \
+                    record = planner.last_record.to_dict())
+    except Exception as e:
+        line['error'] = f'{type(e).__name__}: {e}'
+    return line
+
+def solve_batch(scenarios : list[dict], workers : int = None, out : TextIO = None, \
+                cache : plan_cache = None) -> Iterator[dict]:
+    '''
+    solves scenarios with at most workers (default: one per cpu) at a time and yields a result per scenario,
+    in the order they finish. each result is also written to out as a json line.
+    every solve also starts solver processes, leave cores for lpg_seeds or the portfolio when using them.
+    '''
+    with planner_pool(workers) as pool:
+        futures = {pool.executor.submit(_run, i, s, cache) : i for i, s in enumerate(scenarios)}
+        for future in as_completed(futures):
+            try:
+                line = future.result()
+            except Exception as e: #the worker died, e.g. a BrokenProcessPool
+                i = futures[future]
+                line = {'index' : i, 'name' : scenarios[i].get('name', str(i)), 'status' : 'error', 'found' : False,
+                        'makespan' : None, 'plan' : None, 'record' : None, 'error' : f'{type(e).__name__}: {e}'}
+            if out is not None:
+                out.write(json.dumps(line, default = float) + '\n')
+                out.flush()
+            yield line
+
+def read_scenarios(f : TextIO) -> list[dict]:
+    #a json list of scenarios or one scenario per line
+    text = f.read()
+    if text.lstrip().startswith('['):
+        return json.loads(text)
+    return [json.loads(l) for l in text.splitlines() if l.strip()]
+
+def main(argv = None) -> int:
+    parser = argparse.ArgumentParser(prog = 'python -m maildelivery.batch', description = 'solve many scenarios')
+    parser.add_argument('scenarios', help = "json list or jsonl file of scenarios, '-' for stdin")
+    parser.add_argument('-o', '--output', default = '-', help = "jsonl results, '-' for stdout")
+    parser.add_argument('-j', '--workers', type = int, default = None, help = 'solves at a time, default: cpu count')
+    parser.add_argument('--cache', default = None, help = 'plan cache directory')
+    args = parser.parse_args(argv)
+
+    if args.scenarios == '-':
+        scenarios = read_scenarios(sys.stdin)
+    else:
+        with open(args.scenarios) as f:
+            scenarios = read_scenarios(f)
+    cache = plan_cache(args.cache) if args.cache is not None else None
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        failed = sum(not line['found'] for line in solve_batch(scenarios, args.workers, out, cache))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f'{len(scenarios) - failed}/{len(scenarios)} scenarios solved', file = sys.stderr)
+    return 0 if failed == 0 else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
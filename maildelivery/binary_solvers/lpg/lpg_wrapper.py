@@ -3,32 +3,120 @@
 
 import os
 import subprocess
-from typing import Literal
+import time
+from typing import Literal, Iterator, Callable
 
-from maildelivery.binary_solvers.paths import DOMAIN_PATH, PROBLEM_PATH, PLAN_PATH, PDDL_DIR
+from maildelivery.binary_solvers.paths import PLAN_PATH
+from maildelivery.binary_solvers.workspace import workspace, shared_workspace
+from maildelivery.binary_solvers import process
+from maildelivery.binary_solvers.result import incumbent, solve_result, follow
 DIR_PATH = os.path.join(os.path.dirname(__file__))
 BINARY_NAME = "lpg-td"
-LPG_PLAN_PATH = os.path.join(DIR_PATH,'lpg_plan')
+BINARY_PATH = os.path.join(DIR_PATH,BINARY_NAME)
+LPG_PLAN_NAME = 'lpg_plan' #lpg writes lpg_plan.SOL in speed/quality modes and lpg_plan_{i}.SOL in "n" mode
 n = 3
+SEED = 1 #lpg's results vary a lot from seed to seed, see portfolio.solve's lpg_seeds
 
-def run(mode : Literal["speed", "quality", f"n {n}"] = f"n {n}", n_user = None):
+def start(ws : workspace, mode : Literal["speed", "quality", f"n {n}"] = f"n {n}", n_user = None, \
+             stdout = None, memory_limit : int = None, timeout : float = None, seed : int = SEED) -> process.solver_process:
+    #all lpg outputs are written into the workspace (cwd). see process.start for the limits
     if n_user != None:
-        n = n_user
-        mode = f"n {n}"
-
-    p = subprocess.run(f"./{BINARY_NAME} -o {DOMAIN_PATH} -f {PROBLEM_PATH} -{mode} \
-        -seed 1 -out {LPG_PLAN_PATH}", \
-         cwd = DIR_PATH, shell = True)
-    found_solution = p.returncode == 0
-    if found_solution:
-        if mode == "speed" or mode == "quality":
-            p = subprocess.run(f"mv plan_problem.pddl.SOL {PLAN_PATH}", cwd = PDDL_DIR, shell = True)
-        elif mode == f"n {n}":
-            solfile = LPG_PLAN_PATH + f"_{n}.SOL"
-            p = subprocess.run(f"mv {solfile} {PLAN_PATH}", cwd = PDDL_DIR, shell = True)
-            p = subprocess.run('find . -type f -name "*.SOL" -delete', cwd = DIR_PATH, shell = True)
+        mode = f"n {n_user}"
+
+    return process.start([BINARY_PATH, "-o", ws.domain_path, "-f", ws.problem_path] + f"-{mode}".split() + \
+        ["-seed", str(seed), "-out", LPG_PLAN_NAME], cwd = ws.dir, stdout = stdout, \
+        memory_limit = memory_limit, timeout = timeout)
+
+def collect(ws : workspace, p : process.solver_process = None) -> bool:
+    #moves the best .SOL found into ws.plan_path. also works on a run that was stopped early,
+    #as in "n" mode every improving plan is written as soon as it is found
+    solfiles = [f for f in os.listdir(ws.dir) if f.startswith(LPG_PLAN_NAME) and f.endswith(".SOL")]
+    if len(solfiles) == 0:
+        return False
+    def solution_number(f):
+        f = f[len(LPG_PLAN_NAME):-len(".SOL")]
+        return int(f[1:]) if f else 0
+    solfile = max(solfiles, key = solution_number)
+    os.replace(ws.path(solfile), ws.plan_path)
+    for f in os.listdir(ws.dir):
+        if f.endswith(".SOL") or f == LPG_PLAN_NAME:
+            os.remove(ws.path(f))
+    return True
+
+def run(mode : Literal["speed", "quality", f"n {n}"] = f"n {n}", n_user = None, ws : workspace = None):
+    if ws is None:
+        ws = shared_workspace()
+
+    p = start(ws, mode, n_user)
+    process.wait(p)
+    found_solution = p.returncode == 0 and collect(ws, p)
     return found_solution
 
+def run_anytime(ws : workspace, n_user = None, deadline : float = None, metric_cutoff : float = None, \
+                    memory_limit : int = None) -> Iterator[incumbent]:
+    '''
+    runs lpg in "n" mode and yields every improving plan as soon as lpg reports it, while lpg keeps searching.
+    stop early by breaking out of the loop (closing the generator), with deadline [s],
+    or once a plan's quality is <= metric_cutoff. lpg is killed either way.
+    '''
+    p = start(ws, n_user = n if n_user is None else n_user, stdout = subprocess.PIPE, \
+                memory_limit = memory_limit, timeout = deadline)
+    return incumbents(p, ws, metric_cutoff)
+
+def incumbents(p : process.solver_process, ws : workspace, metric_cutoff : float = None) -> Iterator[incumbent]:
+    #plans of a running lpg started with stdout = subprocess.PIPE, see run_anytime
+    try:
+        number = None
+        metric = None
+        for line in p.stdout:
+            line = line.decode(errors = 'ignore').strip()
+            if line.startswith('Solution number:'):
+                number = int(line.split(':')[1])
+            elif line.startswith('Plan quality:'):
+                metric = float(line.split(':')[1])
+            elif line.startswith('Plan file:') and number is not None:
+                #printed once lpg_plan_{number}.SOL is fully written
+                t = time.time()
+                execution_times, actions, durations = get_plan(ws.path(f"{LPG_PLAN_NAME}_{number}.SOL"))
+                p.parse_time += time.time() - t
+                p.incumbent_times.append(t - p.start_time)
+                yield incumbent('lpg', number, t - p.start_time, execution_times, actions, durations, metric)
+                if metric_cutoff is not None and metric is not None and metric <= metric_cutoff:
+                    return
+            read_stats(p, line)
+    finally:
+        process.stop(p)
+        p.stdout.close()
+
+def read_stats(p : process.solver_process, line : str) -> None:
+    #lpg prints a '.' every 50 search steps and restarts its local search when a step limit is exceeded
+    stats = p.stats
+    if line.startswith('Number of actions'):
+        stats['ground_actions'] = int(line.split(':')[1])
+    elif line.startswith('Number of facts'):
+        stats['facts'] = int(line.split(':')[1])
+    elif line.startswith('Preprocessing total time:'):
+        stats['preprocessing_time'] = float(line.split(':')[1].split()[0])
+    elif line.startswith('Total Num Flips:'):
+        stats['flips'] = int(line.split(':')[1])
+    stats['search_steps'] = stats.get('search_steps', 0) + 50 * (len(line) - len(line.lstrip('.')))
+    stats['restarts'] = stats.get('restarts', 0) + line.count('Restart using')
+    process.read_out_of_memory(p, line)
+
+def solve(ws : workspace, n_user = None, deadline : float = None, memory_limit : int = None, \
+            metric_cutoff : float = None, on_incumbent : Callable[[incumbent], bool] = None) -> solve_result:
+    '''
+    anytime lpg run under a wall clock deadline [s] and memory_limit [MB].
+    on_incumbent sees every improving plan, returning True stops the search.
+    the result holds the last plan found, also when lpg timed out.
+    '''
+    p = start(ws, n_user = n if n_user is None else n_user, stdout = subprocess.PIPE, \
+                memory_limit = memory_limit, timeout = deadline)
+    best = follow(incumbents(p, ws, metric_cutoff), on_incumbent)
+    r = process.result('lpg', p, best)
+    r.seed = SEED
+    return r
+
 def get_plan(file = None):
     if file is None:
         file = PLAN_PATH
@@ -1,26 +1,45 @@
+import re
+
 from maildelivery.binary_solvers.paths import PROBLEM_PATH
 
-def add_problem_lines(added_lines : list[str]):
-    with open(PROBLEM_PATH, 'r') as file:
-        lines = file.readlines()
+def add_lines_to_problem(problem : str, added_lines : list[str]) -> str:
+    #same as add_problem_lines, on the problem text instead of the file
+    lines = problem.rstrip('\n').split('\n')
+    return '\n'.join(lines[:-1] + added_lines + [')'])
+
+def remove_init_values(problem : str, fluent : str, value : float) -> str:
+    #drops every '(= (fluent ...) value)' from the problem text. used for fluents whose default only marks
+    #groundings no action should use: a numeric fluent left undefined keeps the solver from grounding them
+    pattern = re.compile(rf' ?\(= \({fluent} [^()]*\) (-?[\d.]+)\)')
+    return pattern.sub(lambda m: '' if float(m.group(1)) == value else m.group(0), problem)
+
+def add_problem_lines(added_lines : list[str], file = None):
+    if file is None:
+        file = PROBLEM_PATH
+
+    with open(file, 'r') as f:
+        lines = f.readlines()
         ii = 0
         for line in lines[::-1]:
             if line == '\n':
                 ii += 1
             else:
                 break
-    with open(PROBLEM_PATH, 'w') as file:
+    with open(file, 'w') as f:
         for line in lines[:-(1+ii)]:
-            file.write(line)
+            f.write(line)
         for line in added_lines:
-            file.write(line + '\n')
-        file.write(')')
+            f.write(line + '\n')
+        f.write(')')
+
+def remove_problem_lines(n : int, file = None):
+    if file is None:
+        file = PROBLEM_PATH
 
-def remove_problem_lines(n : int):
-    with open(PROBLEM_PATH, 'r') as file:
-        lines = file.readlines()
-    with open(PROBLEM_PATH, 'w') as file:
+    with open(file, 'r') as f:
+        lines = f.readlines()
+    with open(file, 'w') as f:
         lines = lines[:-(n + 2)] #remove the previous ')'
         newlines = lines +  [')']
         for line in newlines:
-            file.write(line)
\ No newline at end of file
+            f.write(line)
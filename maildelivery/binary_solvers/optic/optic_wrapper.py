@@ -2,21 +2,122 @@
 #https://nms.kcl.ac.uk/planning/software/optic.html
 
 import os
+import re
 import subprocess
+import time
+from typing import Iterator, Callable
 
-from maildelivery.binary_solvers.paths import DOMAIN_PATH, PROBLEM_PATH, PLAN_PATH
+from maildelivery.binary_solvers.paths import PLAN_PATH
+from maildelivery.binary_solvers.workspace import workspace, shared_workspace
+from maildelivery.binary_solvers import process
+from maildelivery.binary_solvers.result import incumbent, solve_result, follow
 DIR_PATH = os.path.join(os.path.dirname(__file__))
 
 OPTIC_NO_LP = "optic-rewrite-no-lp" #rewrite is the "new version"
 OPTIC_CLP = "optic-clp -N"
 BINARY_NAME = OPTIC_NO_LP
+PLAN_LINE = re.compile(r'^\s*\d+(\.\d*)?:\s*\(') #"0.000: (move r0 l0 l1)  [1.000]"
 
-def run():
-    p = subprocess.run(f"./{BINARY_NAME} {DOMAIN_PATH} {PROBLEM_PATH} > {PLAN_PATH}", \
-         cwd = DIR_PATH, shell = True)
-    found_solution = p.returncode == 0
+def start(ws : workspace, stdout = None, memory_limit : int = None, timeout : float = None) -> process.solver_process:
+    #optic prints its plans to stdout, which by default goes straight into ws.plan_path.
+    #see process.start for the limits
+    cmd = BINARY_NAME.split()
+    cmd = [os.path.join(DIR_PATH, cmd[0])] + cmd[1:] + [ws.domain_path, ws.problem_path]
+    if stdout is not None:
+        return process.start(cmd, cwd = DIR_PATH, stdout = stdout, memory_limit = memory_limit, timeout = timeout)
+    with open(ws.plan_path, 'w') as f:
+        p = process.start(cmd, cwd = DIR_PATH, stdout = f, memory_limit = memory_limit, timeout = timeout)
+    return p
+
+def collect(ws : workspace, p : process.solver_process) -> bool:
+    #plan is complete only if optic finished its search
+    return p.returncode == 0
+
+def run(ws : workspace = None):
+    if ws is None:
+        ws = shared_workspace()
+
+    p = start(ws)
+    process.wait(p)
+    found_solution = collect(ws, p)
     return found_solution
 
+def run_anytime(ws : workspace, deadline : float = None, metric_cutoff : float = None, \
+                    memory_limit : int = None) -> Iterator[incumbent]:
+    '''
+    runs optic and yields every improving plan it prints, as soon as the plan is complete on stdout.
+    stdout is still copied to ws.plan_path, so get_plan(ws.plan_path) reads the last plan afterwards.
+    stop early by breaking out of the loop, with deadline [s], or once a plan's metric is <= metric_cutoff.
+    optic is killed either way.
+    '''
+    p = start(ws, stdout = subprocess.PIPE, memory_limit = memory_limit, timeout = deadline)
+    return incumbents(p, ws.plan_path, metric_cutoff)
+
+def incumbents(p : process.solver_process, plan_copy : str = None, metric_cutoff : float = None) -> Iterator[incumbent]:
+    #plans of a running optic started with stdout = subprocess.PIPE, see run_anytime.
+    #plans are parsed straight from the pipe, plan_copy is an optional file to copy stdout into
+    def lines(f):
+        for line in p.stdout:
+            line = line.decode(errors = 'ignore')
+            if plan_copy is not None:
+                f.write(line)
+            read_stats(p, line)
+            yield line
+
+    try:
+        with open(plan_copy if plan_copy is not None else os.devnull, 'w') as f:
+            for number, (block, metric) in enumerate(plan_blocks(lines(f)), start = 1):
+                yield parsed(p, number, block, metric)
+                if metric_cutoff is not None and metric is not None and metric <= metric_cutoff:
+                    return
+    finally:
+        process.stop(p)
+        p.stdout.close()
+
+def plan_blocks(lines : Iterator[str]) -> Iterator[tuple[list[str], float]]:
+    '''
+    (plan lines, metric) of every plan in optic's output. the metric is the one of the header printed before the plan,
+    "; Plan found with metric 21.003" or, for the final plan, "; Cost: 21.003", None without one.
+    the final plan optic repeats after its last improvement is skipped
+    '''
+    metric = None
+    block, last = [], None
+    for line in lines:
+        if PLAN_LINE.match(line):
+            block.append(line)
+            continue
+        if block: #first line after a plan closes it
+            if [l.strip() for l in block] != last:
+                yield block, metric
+            block, last, metric = [], [l.strip() for l in block], None
+        if line.startswith(';') and ('metric' in line or 'Cost:' in line):
+            metric = float(line.split()[-1])
+    if block and [l.strip() for l in block] != last: #the final plan ends optic's output
+        yield block, metric
+
+def parsed(p : process.solver_process, number : int, block : list[str], metric : float) -> incumbent:
+    t = time.time()
+    plan = get_plan_from_lines(block)
+    p.parse_time += time.time() - t
+    p.incumbent_times.append(t - p.start_time)
+    return incumbent('optic', number, t - p.start_time, *plan, metric)
+
+def read_stats(p : process.solver_process, line : str) -> None:
+    #"; States evaluated so far: 1234" after each plan, "; States evaluated: 1234" at the end
+    if line.startswith(';') and 'States evaluated' in line:
+        p.stats['states_evaluated'] = int(line.split(':')[1])
+
+def solve(ws : workspace, deadline : float = None, memory_limit : int = None, \
+            metric_cutoff : float = None, on_incumbent : Callable[[incumbent], bool] = None) -> solve_result:
+    '''
+    anytime optic run under a wall clock deadline [s] and memory_limit [MB].
+    on_incumbent sees every improving plan, returning True stops the search.
+    the result holds the last plan found, also when optic timed out.
+    '''
+    p = start(ws, stdout = subprocess.PIPE, memory_limit = memory_limit, timeout = deadline)
+    best = follow(incumbents(p, metric_cutoff = metric_cutoff), on_incumbent)
+    return process.result('optic', p, best)
+
 def get_plan(file = None):
     if file is None:
         file = PLAN_PATH
@@ -31,7 +132,9 @@ def get_plan(file = None):
             last = i
 
     lines = lines[last+1:]
+    return get_plan_from_lines(lines)
 
+def get_plan_from_lines(lines : list[str]):
     execution_times = []
     actions = []
     durations = []
@@ -2,6 +2,13 @@ import os
 
 DIR_PATH = os.path.join(os.path.dirname(__file__))
 PDDL_DIR = DIR_PATH
-DOMAIN_PATH = os.path.join(PDDL_DIR,"domain.pddl")
-PROBLEM_PATH = os.path.join(PDDL_DIR,"problem.pddl")
-PLAN_PATH = os.path.join(PDDL_DIR,"plan.txt")
\ No newline at end of file
+DOMAIN_FILE = "domain.pddl"
+PROBLEM_FILE = "problem.pddl"
+PLAN_FILE = "plan.txt"
+DOMAIN_PATH = os.path.join(PDDL_DIR,DOMAIN_FILE)
+PROBLEM_PATH = os.path.join(PDDL_DIR,PROBLEM_FILE)
+PLAN_PATH = os.path.join(PDDL_DIR,PLAN_FILE)
+
+#solve workspaces go to RAM when possible, saving the disk round trips of writing pddls and reading plans
+RAM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+WORKSPACE_DIR = os.environ.get("MAILDELIVERY_WORKSPACE_DIR", RAM_DIR) #None falls back to the system temp dir
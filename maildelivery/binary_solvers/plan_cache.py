@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+import tempfile
+
+from maildelivery.binary_solvers.result import solve_result
+
+CACHE_DIR = os.environ.get('MAILDELIVERY_PLAN_CACHE', \
+                os.path.join(os.path.expanduser('~'), '.cache', 'maildelivery', 'plans'))
+MAX_SIZE = 100.0 #[MB]
+
+class plan_cache:
+    '''
+    on disk cache of solved plans, keyed by a hash of domain + problem + engine + options.
+    one json file per plan. reading a plan refreshes its mtime, and the least recently used
+    plans are evicted once the cache grows over max_size [MB].
+    safe to share between processes: files are replaced atomically and evictions may race harmlessly.
+    '''
+    def __init__(self, dir : str = CACHE_DIR, max_size : float = MAX_SIZE) -> None:
+        self.dir = dir
+        self.max_size = max_size
+        os.makedirs(dir, exist_ok = True)
+
+    @staticmethod
+    def key(domain : str, problem : str, engine_name : str, **options) -> str:
+        #whitespace is normalized so formatting differences don't change the key
+        h = hashlib.sha256()
+        for text in [domain, problem]:
+            h.update(' '.join(text.split()).encode())
+            h.update(b'\0')
+        h.update(json.dumps([engine_name, options], sort_keys = True).encode())
+        return h.hexdigest()
+
+    def path(self, key : str) -> str:
+        return os.path.join(self.dir, key + '.json')
+
+    def get(self, key : str) -> solve_result:
+        try:
+            with open(self.path(key)) as f:
+                entry = json.load(f)
+            os.utime(self.path(key)) #mark as recently used
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return solve_result(entry['engine'], entry['status'], True, entry['execution_times'], \
+                            [tuple(a) for a in entry['actions']], entry['durations'], entry['solve_time'], \
+                            seed = entry.get('seed'))
+
+    def put(self, key : str, result : solve_result) -> None:
+        entry = {'engine' : result.engine,
+                 'status' : result.status,
+                 'execution_times' : result.execution_times,
+                 'actions' : [list(a) for a in result.actions],
+                 'durations' : result.durations,
+                 'solve_time' : result.solve_time,
+                 'seed' : result.seed}
+        fd, tmp = tempfile.mkstemp(dir = self.dir, suffix = '.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp, self.path(key))
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        for f in os.listdir(self.dir):
+            if not f.endswith('.json'):
+                continue
+            try:
+                st = os.stat(os.path.join(self.dir, f))
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, f))
+        size = sum([e[1] for e in entries])
+        for mtime, fsize, f in sorted(entries):
+            if size <= self.max_size * 2**20:
+                break
+            try:
+                os.remove(os.path.join(self.dir, f))
+            except FileNotFoundError:
+                pass
+            size -= fsize
+
+    def clear(self) -> None:
+        for f in os.listdir(self.dir):
+            if f.endswith('.json'):
+                os.remove(os.path.join(self.dir, f))
@@ -0,0 +1,152 @@
+import queue
+import subprocess
+import threading
+import time
+from typing import Literal, Callable
+
+from maildelivery.binary_solvers.workspace import workspace
+from maildelivery.binary_solvers.result import solve_result, incumbent
+from maildelivery.binary_solvers import process
+from maildelivery.binary_solvers.optic import optic_wrapper
+from maildelivery.binary_solvers.lpg import lpg_wrapper
+from maildelivery.binary_solvers.tamer import tamer_wrapper
+
+ENGINES = ('optic', 'lpg', 'tamer')
+
+def start_engine(engine_name : str, ws : workspace, lpg_n = 3, memory_limit : int = None, deadline : float = None, \
+                    seed : int = lpg_wrapper.SEED, tamer_defaults : dict[str, float] = None) -> process.solver_process:
+    #optic and lpg report their plans on stdout as they find them, tamer writes its one plan to ws.plan_path
+    if engine_name == 'optic':
+        return optic_wrapper.start(ws, stdout = subprocess.PIPE, memory_limit = memory_limit, timeout = deadline)
+    if engine_name == 'lpg':
+        return lpg_wrapper.start(ws, n_user = lpg_n, stdout = subprocess.PIPE, memory_limit = memory_limit, \
+                                    timeout = deadline, seed = seed)
+    if engine_name == 'tamer':
+        return tamer_wrapper.start(ws, memory_limit = memory_limit, timeout = deadline, defaults = tamer_defaults)
+    raise ValueError(f'unknown engine {engine_name}')
+
+def incumbents(engine_name : str, ws : workspace, p : process.solver_process, metric_cutoff : float = None):
+    #every plan of a running engine, as soon as it is found
+    if engine_name == 'optic':
+        return optic_wrapper.incumbents(p, metric_cutoff = metric_cutoff)
+    if engine_name == 'lpg':
+        return lpg_wrapper.incumbents(p, ws, metric_cutoff)
+    return tamer_incumbents(ws, p)
+
+def tamer_incumbents(ws : workspace, p : process.solver_process):
+    #tamer is not anytime, its plan is there once it exits
+    process.wait(p)
+    if tamer_wrapper.collect(ws, p):
+        t = time.time()
+        plan = tamer_wrapper.get_plan(ws.plan_path)
+        p.parse_time += time.time() - t
+        p.incumbent_times.append(t - p.start_time)
+        yield incumbent('tamer', 1, t - p.start_time, *plan)
+
+def solve(ws : workspace, engines = ENGINES, deadline : float = None, \
+            policy : Literal['best', 'first'] = 'best', lpg_n = 3, memory_limit : int = None, \
+            metric_cutoff : float = None, on_incumbent : Callable[[incumbent], bool] = None, lpg_seeds = None, \
+            tamer_defaults : dict[str, float] = None) -> solve_result:
+    '''
+    runs the engines in parallel on the domain and problem of ws, each in a child workspace, reading every plan
+    as soon as it is found. policy 'first' returns the first plan found. policy 'best' waits for all engines
+    (or the deadline) and returns the plan with the lowest makespan. deadline is wall clock seconds from the call,
+    memory_limit [MB] applies to each engine. the race also ends once a plan's metric is <= metric_cutoff or
+    on_incumbent, seeing every plan, returns True. lpg_seeds (a count K or a list of seeds) runs one lpg per seed.
+    tamer runs on the same pddl, tamer_defaults {fluent : value} fills the numeric facts the problem leaves out for
+    optic and lpg (see tamer_wrapper), without them unified_planning refuses the problem and tamer never plans.
+    solvers still running when we return are killed, the plans they found are kept.
+    engines that could not be started are in the result's stats['not_started'], runs whose plans could not be
+    read in stats['failed']. with policy 'best', runs stopped by the deadline are in stats['cut_off'].
+    '''
+    t0 = time.time()
+    if isinstance(lpg_seeds, int):
+        lpg_seeds = list(range(1, lpg_seeds + 1))
+    runs = [(e, s) for e in engines for s in ((lpg_seeds or [lpg_wrapper.SEED]) if e == 'lpg' else [None])]
+
+    def name(run) -> str:
+        engine_name, seed = run
+        return engine_name if seed is None or lpg_seeds is None else f'{engine_name}_seed{seed}'
+
+    found = queue.Queue()
+    failed = {} #runs whose plans could not be read
+    def follow_run(run, sub, p):
+        try:
+            for inc in incumbents(run[0], sub, p, metric_cutoff):
+                found.put((run, inc))
+        except Exception as e:
+            failed[run] = repr(e) #reported in the result, the None below ends the run
+        finally:
+            found.put((run, None)) #run is over, also when reading its plans failed
+
+    running = {}
+    not_started = {}
+    for run in runs:
+        engine_name, seed = run
+        sub = ws.child(name(run))
+        try:
+            p = start_engine(engine_name, sub, lpg_n, memory_limit, deadline, seed or lpg_wrapper.SEED, tamer_defaults)
+        except OSError as e: #binary missing on this machine
+            not_started[engine_name] = str(e)
+            continue
+        reader = threading.Thread(target = follow_run, args = [run, sub, p], daemon = True)
+        reader.start()
+        running[run] = (p, reader)
+
+    best = {} #last plan of each run
+    first = None
+    timed_out = False
+    remaining = len(running)
+    try:
+        while remaining > 0:
+            wait = None if deadline is None else deadline - (time.time() - t0)
+            try:
+                run, inc = found.get(timeout = None if wait is None else max(0.0, wait))
+            except queue.Empty:
+                timed_out = True
+                break
+            if inc is None:
+                remaining -= 1
+                continue
+            best[run] = inc
+            first = first or run
+            if policy == 'first' or (on_incumbent is not None and on_incumbent(inc)) or \
+                    (metric_cutoff is not None and inc.metric is not None and inc.metric <= metric_cutoff):
+                break
+    finally:
+        for p, reader in running.values():
+            process.stop(p, timed_out = timed_out)
+        for p, reader in running.values():
+            reader.join()
+
+    #plans found while the race was being stopped are kept too
+    while not found.empty():
+        run, inc = found.get()
+        if inc is not None:
+            best[run] = inc
+            first = first or run
+
+    results = {}
+    for run, (p, reader) in running.items():
+        r = process.result(run[0], p, best.get(run))
+        if run[0] == 'lpg':
+            r.seed = run[1]
+        results[run] = r
+    if first is not None:
+        r = results[first] if policy == 'first' else \
+                min([results[run] for run in best], key = lambda r: r.makespan)
+        #runs the deadline stopped might have found a better plan, with more time the best plan can differ
+        cut_off = [name(run) for run, (p, reader) in running.items() if p.timed_out]
+        if policy == 'best' and len(cut_off) > 0:
+            r.stats['cut_off'] = cut_off
+    else:
+        statuses = [r.status for r in results.values()]
+        #an engine stopped by its own timeout (the deadline it was started with) did not prove there is no plan
+        status = 'timeout' if timed_out or 'timeout' in statuses else 'oom' if 'oom' in statuses else \
+                    'error' if failed else 'unsolvable'
+        r = solve_result(engines[0] if len(engines) == 1 else 'portfolio', status, solve_time = time.time() - t0)
+    if not_started:
+        r.stats['not_started'] = not_started
+    if failed:
+        r.stats['failed'] = {name(run) : e for run, e in failed.items()}
+    return r
@@ -0,0 +1,166 @@
+import os
+import resource
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+from maildelivery.binary_solvers.result import solve_result, incumbent
+
+STOP_GRACE = 1.0 #[s] time given to a solver to exit after SIGTERM before it is SIGKILLed
+WAIT_INTERVAL_MIN = 0.001 #[s] first sleep between checks whether a solver exited, doubled up to WAIT_INTERVAL_MAX
+WAIT_INTERVAL_MAX = 0.05 #[s]
+OOM_RSS_FRACTION = 0.9 #peak rss above this fraction of the memory limit counts as running out of memory
+UNKNOWN_RETURNCODE = 255 #of a solver reaped by someone else, its exit status is lost
+#what the solvers print when an allocation fails: lpg (its memory.c and flex scanner), optic (c++) and tamer (python)
+OUT_OF_MEMORY_MESSAGES = ('ran out of memory', 'NO MEMORY in file', 'memory exhausted', 'out of dynamic memory', \
+                            'std::bad_alloc', 'MemoryError', 'Cannot allocate memory')
+
+class solver_process(subprocess.Popen):
+    '''
+    Popen of a solver, started in a process group of its own and optionally under limits.
+    reaping goes through process.wait() (os.wait4) so the peak rss of the solver is kept. only use
+    process.wait()/finished(), Popen's wait() and poll() reap without it.
+    '''
+    memory_limit : int = None #[MB]
+    start_time : float = None
+    timed_out : bool = False
+    stopped : bool = False #signalled by stop()
+    out_of_memory_reported : bool = False
+    reaped_elsewhere : bool = False #returncode is UNKNOWN_RETURNCODE, not the solver's
+    rusage = None
+    reap_lock : threading.Lock = None
+    timer : threading.Timer = None
+    stderr_thread : threading.Thread = None
+    #telemetry, filled by whoever reads the solver's output
+    stats : dict = None #search statistics of the solver, see optic_wrapper/lpg_wrapper read_stats
+    incumbent_times : list[float] = None #[s] since start, of every plan found
+    parse_time : float = 0.0 #[s] spent parsing plans
+
+    @property
+    def peak_rss(self) -> float:
+        #[MB], None while running
+        if self.rusage is None:
+            return None
+        return self.rusage.ru_maxrss / 1024 #linux reports kB
+
+def start(cmd : list[str], cwd : str = None, stdout = None, env : dict = None, \
+            memory_limit : int = None, timeout : float = None) -> solver_process:
+    '''
+    no shell in between, and a process group of its own so stop() also reaches anything the solver spawned.
+    memory_limit [MB] caps the address space (RLIMIT_AS). timeout [s] stops the solver and marks it timed_out.
+    stderr is forwarded to ours, watching for the solvers' out of memory messages (OUT_OF_MEMORY_MESSAGES).
+    '''
+    limit = None
+    if memory_limit is not None:
+        #in the child before exec, so the solver never runs without it. only setrlimit runs there, no locks are taken
+        m = int(memory_limit * 2**20)
+        limit = lambda: resource.setrlimit(resource.RLIMIT_AS, (m, m))
+    p = solver_process(cmd, cwd = cwd, stdout = stdout, stderr = subprocess.PIPE, env = env, \
+                        start_new_session = True, preexec_fn = limit)
+    p.start_time = time.time()
+    p.memory_limit = memory_limit
+    p.stats = {}
+    p.reap_lock = threading.Lock()
+    p.incumbent_times = []
+    p.stderr_thread = threading.Thread(target = forward_stderr, args = [p], daemon = True)
+    p.stderr_thread.start()
+    if timeout is not None:
+        p.timer = threading.Timer(timeout, stop, [p], {'timed_out' : True})
+        p.timer.daemon = True
+        p.timer.start()
+    return p
+
+def forward_stderr(p : solver_process) -> None:
+    for line in p.stderr:
+        line = line.decode(errors = 'ignore')
+        read_out_of_memory(p, line)
+        sys.stderr.write(line)
+    p.stderr.close()
+
+def read_out_of_memory(p : solver_process, line : str) -> None:
+    #of any output line of the solver, lpg prints its message on stdout
+    if any(m in line for m in OUT_OF_MEMORY_MESSAGES):
+        p.out_of_memory_reported = True
+
+def wait(p : solver_process, timeout : float = None) -> int:
+    '''
+    reaps the solver with os.wait4, keeping its rusage for peak_rss, and returns its returncode.
+    raises subprocess.TimeoutExpired like Popen.wait
+    '''
+    end = None if timeout is None else time.time() + timeout
+    delay = WAIT_INTERVAL_MIN
+    while p.returncode is None:
+        with p.reap_lock:
+            if p.returncode is not None:
+                break
+            try:
+                pid, sts, rusage = os.wait4(p.pid, os.WNOHANG)
+            except ChildProcessError: #reaped by someone else, whether it succeeded is unknown
+                p.reaped_elsewhere = True
+                p.returncode = UNKNOWN_RETURNCODE
+                break
+            if pid == p.pid:
+                p.rusage = rusage
+                p.returncode = os.waitstatus_to_exitcode(sts)
+                break
+        if end is not None and time.time() >= end:
+            raise subprocess.TimeoutExpired(p.args, timeout)
+        time.sleep(delay if end is None else max(0.0, min(delay, end - time.time())))
+        delay = min(2 * delay, WAIT_INTERVAL_MAX)
+    return p.returncode
+
+def finished(p : solver_process) -> bool:
+    try:
+        wait(p, 0)
+    except subprocess.TimeoutExpired:
+        return False
+    return True
+
+def stop(p : solver_process, grace : float = STOP_GRACE, timed_out = False) -> None:
+    if p.timer is not None:
+        p.timer.cancel()
+    if finished(p):
+        return
+    p.timed_out = p.timed_out or timed_out
+    p.stopped = True
+    try:
+        os.killpg(p.pid, signal.SIGTERM)
+        wait(p, grace)
+    except ProcessLookupError:
+        pass
+    except subprocess.TimeoutExpired:
+        try:
+            os.killpg(p.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    wait(p)
+
+def status(p : solver_process, found : bool) -> str:
+    #'solved', 'timeout', 'oom', 'unsolvable' or 'error' for a solver that is done
+    wait(p)
+    p.stderr_thread.join(STOP_GRACE)
+    if p.timed_out:
+        return 'timeout'
+    if found:
+        return 'solved'
+    if p.reaped_elsewhere:
+        return 'error'
+    if p.stopped and p.returncode in (-signal.SIGTERM, -signal.SIGKILL):
+        return 'unsolvable' #cancelled by stop(), not out of memory
+    if p.memory_limit is not None and (p.returncode < 0 or p.out_of_memory_reported or \
+            (p.peak_rss is not None and p.peak_rss >= OOM_RSS_FRACTION * p.memory_limit)):
+        return 'oom'
+    if p.returncode < 0 and p.returncode != -signal.SIGTERM and p.returncode != -signal.SIGKILL:
+        return 'error' #crashed
+    return 'unsolvable'
+
+def result(engine_name : str, p : solver_process, best : incumbent) -> solve_result:
+    #solve_result of a finished solver and the best plan it left (None if there is none)
+    r = solve_result(engine_name, status(p, best is not None), best is not None, \
+                        solve_time = time.time() - p.start_time, peak_rss = p.peak_rss, parse_time = p.parse_time, \
+                        incumbent_times = p.incumbent_times, stats = p.stats)
+    if best is not None:
+        r.execution_times, r.actions, r.durations = best.plan()
+    return r
@@ -0,0 +1,74 @@
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
+@dataclass
+class solve_result:
+    engine : str
+    status : str #'solved', 'timeout', 'oom', 'unsolvable', 'error' or 'refused' (see grounding)
+    found : bool = False #a plan was found. true also for a timeout that left an incumbent behind
+    execution_times : list[float] = field(default_factory = list)
+    actions : list[tuple] = field(default_factory = list)
+    durations : list[float] = field(default_factory = list)
+    solve_time : float = None #[s] wall clock
+    peak_rss : float = None #[MB] of the solver process
+    seed : int = None #random seed of the solver run that found the plan (lpg)
+    parse_time : float = None #[s] spent parsing plans
+    incumbent_times : list[float] = field(default_factory = list) #[s] since start, of every plan found
+    stats : dict = field(default_factory = dict) #search statistics reported by the solver
+
+    @property
+    def makespan(self) -> float:
+        return makespan(self.execution_times, self.durations)
+
+    def plan(self):
+        return self.execution_times, self.actions, self.durations
+
+    def __repr__(self):
+        seed = f", seed {self.seed}" if self.seed is not None else ""
+        return f"{self.engine} {self.status}, makespan {self.makespan}{seed}"
+
+class solve_error(Exception):
+    #raised by robot_planner.solve when no plan was found, result tells why
+    def __init__(self, result : solve_result):
+        super().__init__(f'solver failed: {result}')
+        self.result = result
+
+    def __reduce__(self): #so it survives being raised in a worker process
+        return solve_error, (self.result,)
+
+def makespan(execution_times : list[float], durations : list[float]) -> float:
+    if len(execution_times) == 0:
+        return None
+    return max([e + d for e, d in zip(execution_times, durations)]) - min(execution_times)
+
+@dataclass
+class incumbent:
+    #an improving plan reported by an anytime solver while it keeps searching
+    engine : str
+    number : int #1 for the first plan found
+    time : float #[s] since the solver was started
+    execution_times : list[float]
+    actions : list[tuple]
+    durations : list[float]
+    metric : float = None #plan quality as reported by the solver
+
+    @property
+    def makespan(self) -> float:
+        return makespan(self.execution_times, self.durations)
+
+    def plan(self):
+        return self.execution_times, self.actions, self.durations
+
+    def __repr__(self):
+        return f"{self.engine} plan {self.number} at {self.time:.2f}[s], makespan {self.makespan}"
+
+def follow(incumbents : Iterator[incumbent], on_incumbent : Callable[[incumbent], bool] = None) -> incumbent:
+    #consumes an anytime solver run and returns its last incumbent (None if no plan was found).
+    #on_incumbent sees every incumbent as it arrives, returning True stops the solver
+    best = None
+    for inc in incumbents:
+        best = inc
+        if on_incumbent is not None and on_incumbent(inc):
+            break
+    incumbents.close()
+    return best
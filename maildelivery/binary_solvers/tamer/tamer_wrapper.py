@@ -0,0 +1,77 @@
+#tamer:
+#https://ojs.aaai.org//index.php/AAAI/article/view/6553
+#tamer lives inside unified_planning, so it is run as a python subprocess on the workspace pddls.
+#this makes it killable like the binary solvers, and its plan is printed in optic's format
+
+import itertools
+import os
+import sys
+
+from maildelivery.binary_solvers.paths import PLAN_PATH
+from maildelivery.binary_solvers.workspace import workspace, shared_workspace
+from maildelivery.binary_solvers import process
+from maildelivery.binary_solvers.optic import optic_wrapper
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+def start(ws : workspace, memory_limit : int = None, timeout : float = None, \
+            defaults : dict[str, float] = None) -> process.solver_process:
+    #make sure the child finds this copy of maildelivery even when it is not pip installed.
+    #defaults {fluent : value} are given to the groundings of numeric fluents the problem leaves undefined
+    env = dict(os.environ, PYTHONPATH = os.pathsep.join([ROOT_DIR, os.environ.get('PYTHONPATH', '')]))
+    defaults = [f'{fluent}={value}' for fluent, value in (defaults or {}).items()]
+    with open(ws.plan_path, 'w') as f:
+        p = process.start([sys.executable, "-m", __name__, ws.domain_path, ws.problem_path, *defaults], \
+            cwd = ws.dir, stdout = f, env = env, \
+            memory_limit = memory_limit, timeout = timeout)
+    return p
+
+def collect(ws : workspace, p : process.solver_process) -> bool:
+    return p.returncode == 0
+
+def run(ws : workspace = None):
+    if ws is None:
+        ws = shared_workspace()
+
+    p = start(ws)
+    process.wait(p)
+    found_solution = collect(ws, p)
+    return found_solution
+
+def get_plan(file = None):
+    if file is None:
+        file = PLAN_PATH
+    return optic_wrapper.get_plan(file)
+
+def set_defaults(problem, defaults : dict[str, float]) -> None:
+    #optic and lpg leave groundings of a numeric fluent without a value out, unified_planning refuses the problem
+    for name, value in defaults.items():
+        if not problem.has_fluent(name):
+            continue
+        fluent = problem.fluent(name)
+        given = problem.explicit_initial_values
+        for objects in itertools.product(*[problem.objects(p.type) for p in fluent.signature]):
+            if fluent(*objects) not in given:
+                problem.set_initial_value(fluent(*objects), value)
+
+def main(domain_path, problem_path, *defaults):
+    import unified_planning as up
+    from unified_planning.shortcuts import OneshotPlanner
+    from unified_planning.io.pddl_reader import PDDLReader
+    up.shortcuts.get_env().credits_stream = None
+
+    problem = PDDLReader().parse_problem(domain_path, problem_path)
+    set_defaults(problem, {d.split('=')[0] : float(d.split('=')[1]) for d in defaults})
+    with OneshotPlanner(name = 'tamer') as engine:
+        result = engine.solve(problem)
+    if result.plan is None:
+        return 1
+
+    print('; tamer plan')
+    for t, a, d in result.plan.timed_actions:
+        d = float(d) if d is not None else 0.0
+        params = ' '.join([str(p) for p in a.actual_parameters])
+        print(f"{float(t):.4f}: ({a.action.name} {params})  [{d:.4f}]")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(*sys.argv[1:]))
@@ -0,0 +1,77 @@
+'''
+one solve_record per robot_planner.solve, handed to a sink: any callable taking the record.
+robot_planner.solve(telemetry_sink = ...) picks the sink of one solve, default_sink is used otherwise.
+
+    records = list_sink()
+    planner.solve(engine_name = 'lpg', telemetry_sink = records)
+    telemetry.default_sink = jsonl_sink('solves.jsonl') #every solve from now on
+'''
+import json
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Callable
+
+from maildelivery.binary_solvers.result import solve_result
+
+@dataclass
+class solve_record:
+    engine : str #as requested, 'portfolio' included
+    solver : str #engine that produced the result
+    status : str #see solve_result
+    found : bool
+    cache_hit : bool
+    build_time : float #[s] create_problem and building the problem (the unified_planning one, or the emitter's map facts)
+    write_time : float #[s] generating and writing the pddls
+    solve_time : float #[s] solver wall clock
+    parse_time : float #[s] parsing plans
+    total_time : float #[s] all of solve
+    peak_rss : float #[MB] of the solver process
+    plan_length : int
+    makespan : float
+    seed : int = None
+    incumbent_times : list[float] = field(default_factory = list) #[s] since the solver started
+    stats : dict = field(default_factory = dict) #search statistics parsed from the solver's output
+    timestamp : float = field(default_factory = time.time)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+def record(engine_name : str, result : solve_result, build_time : float, write_time : float, \
+            total_time : float, cache_hit = False) -> solve_record:
+    return solve_record(engine_name, result.engine, result.status, result.found, cache_hit, build_time, write_time, \
+                        0.0 if cache_hit else result.solve_time, 0.0 if cache_hit else result.parse_time, total_time, \
+                        None if cache_hit else result.peak_rss, len(result.actions), result.makespan, result.seed, \
+                        list(result.incumbent_times), dict(result.stats))
+
+def print_sink(record : solve_record) -> None:
+    solver = record.solver if record.engine == record.solver else f"{record.engine} ({record.solver})"
+    seed = f", seed {record.seed}" if record.seed is not None else ""
+    cached = ", from cache" if record.cache_hit else ""
+    print(f"{solver} {record.status} in {record.total_time:.3f} seconds, {record.plan_length} actions, "
+          f"makespan {record.makespan}{seed}{cached}")
+
+def null_sink(record : solve_record) -> None:
+    pass
+
+class list_sink(list):
+    #keeps the records in memory
+    def __call__(self, record : solve_record) -> None:
+        self.append(record)
+
+class jsonl_sink:
+    #appends one json line per record, safe to share between threads
+    def __init__(self, path : str):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def __call__(self, record : solve_record) -> None:
+        line = json.dumps(record.to_dict())
+        with self.lock:
+            with open(self.path, 'a') as f:
+                f.write(line + '\n')
+
+default_sink : Callable[[solve_record], None] = print_sink
+
+def emit(record : solve_record, sink : Callable[[solve_record], None] = None) -> None:
+    (sink if sink is not None else default_sink)(record)
@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+
+from maildelivery.binary_solvers.paths import PDDL_DIR, DOMAIN_FILE, PROBLEM_FILE, PLAN_FILE, WORKSPACE_DIR
+
+class workspace:
+    '''
+    directory holding the domain, problem and plan files of a single solve.
+    by default a fresh temporary directory is created (in RAM when available, see paths.WORKSPACE_DIR)
+    and removed on cleanup, so solves running in different threads/processes never touch each other's files.
+    passing dir uses that directory as is and leaves it in place (legacy shared files).
+    '''
+    def __init__(self, dir : str = None) -> None:
+        self.temporary = dir is None
+        if self.temporary:
+            dir = tempfile.mkdtemp(prefix = 'maildelivery_', dir = WORKSPACE_DIR)
+        self.dir = dir
+        self.domain_path = os.path.join(dir, DOMAIN_FILE)
+        self.problem_path = os.path.join(dir, PROBLEM_FILE)
+        self.plan_path = os.path.join(dir, PLAN_FILE)
+
+    def path(self, filename : str) -> str:
+        return os.path.join(self.dir, filename)
+
+    def child(self, name : str):
+        #subdirectory with its own plan file that reads the domain and problem of this workspace.
+        #removed together with its parent
+        ws = workspace(self.path(name))
+        os.makedirs(ws.dir, exist_ok = True)
+        ws.domain_path = self.domain_path
+        ws.problem_path = self.problem_path
+        return ws
+
+    def write_pddls(self, domain : str, problem : str) -> None:
+        with open(self.domain_path, 'w') as f:
+            print(domain, file = f)
+        with open(self.problem_path, 'w') as f:
+            print(problem, file = f)
+
+    def cleanup(self) -> None:
+        if self.temporary:
+            shutil.rmtree(self.dir, ignore_errors = True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cleanup()
+
+    def __repr__(self):
+        return f"workspace {self.dir}"
+
+def shared_workspace() -> workspace:
+    #the package directory used before workspaces existed. not safe for concurrent solves
+    return workspace(PDDL_DIR)
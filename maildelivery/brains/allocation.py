@@ -0,0 +1,196 @@
+'''
+decides which robot carries which package before planning, so the solvers only plan one robot at a time.
+
+packages are allocated on road times from numpy cost matrices, by min cost matching in rounds or by an auction
+on the makespan. every robot's packages are then planned on their own in planner_pool workers, on the map without
+where the other robots start and end, and the plans are merged: a robot plan that collides with the plans merged
+so far starts later.
+
+    planner = allocation_planner('bots_charge_added', method = 'auction')
+    execution_times, actions, durations = planner.solve(env, robots, engine_name = 'lpg', deadline = 10.0)
+'''
+import numpy as np
+
+from maildelivery.world import enviorment
+from maildelivery.brains.graph_reduction import shortest_distances
+from maildelivery.binary_solvers.result import solve_result, solve_error
+from maildelivery.brains.region_planner import region_problem, collisions
+from maildelivery.brains.planner_pool import planner_pool, pool_owner, brain_module
+
+INFEASIBLE = 1e9 #added to the cost of a robot running out of charge, it only gets the package when no robot can take it
+
+def min_cost_matching(cost : np.ndarray) -> list[tuple[int,int]]:
+    #(row, column) pairs, every row of the smaller side matched, minimizing the total cost. hungarian method
+    n, m = cost.shape
+    if n > m:
+        return [(i, j) for j, i in min_cost_matching(cost.T)]
+    a = np.zeros((n + 1, m + 1))
+    a[1:,1:] = cost
+    u, v = np.zeros(n + 1), np.zeros(m + 1)
+    p, way = np.zeros(m + 1, dtype = int), np.zeros(m + 1, dtype = int)
+    for i in range(1, n + 1):
+        p[0], j0 = i, 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype = bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            cur = a[i0] - u[i0] - v
+            better = ~used & (cur < minv)
+            minv[better] = cur[better]
+            way[better] = j0
+            free = np.where(~used)[0]
+            free = free[free > 0]
+            j1 = free[np.argmin(minv[free])]
+            delta = minv[j1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0 != 0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    return [(int(p[j]) - 1, j - 1) for j in range(1, m + 1) if p[j] != 0]
+
+class allocation_state:
+    #where every robot's route ends so far, when, and the road it used
+    def __init__(self, robots : list):
+        self.at = np.array([r.last_location for r in robots])
+        self.time = np.zeros(len(robots)) #[s]
+        self.used = np.zeros(len(robots)) #[m]
+
+class allocation_planner(pool_owner):
+    def __init__(self, brain = 'bots_charge_added', method = 'auction', pool : planner_pool = None):
+        '''
+        method is 'auction': packages go one at a time to the robot finishing them first, or 'matching': every
+        round each robot gets at most one package, minimizing the round's total time.
+        pool defaults to one made by the first solve with a worker per robot planned, kept until shutdown(),
+        see planner_pool.pool_owner
+        '''
+        if method not in ['auction', 'matching']:
+            raise ValueError(f'unknown allocation method {method}')
+        self.brain = brain
+        self.method = method
+        self.pool = pool
+        constants = brain_module(brain).robot_planner()
+        self.f_dist2charge = getattr(constants, 'f_dist2charge', None)
+        self.assignment = {} #robot id -> package ids in the order it carries them, of the last solve()
+
+    def cost_matrices(self, env : enviorment, robots : list, D : np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        '''
+        road distances [m] of the routes: to_pickup [L,P] from every location to every package, carry [P] from
+        pickup to goal and back [P,R] from package goals to robot goals
+        '''
+        packages = env.packages or []
+        pickups = np.array([p.owner if p.owner_type == 'location' else robots[p.owner].last_location for p in packages], dtype = int)
+        goals = np.array([p.goal for p in packages], dtype = int)
+        return D[:, pickups], D[pickups, goals], D[np.ix_(goals, [r.goal_location for r in robots])]
+
+    def bids(self, state : allocation_state, robots : list, to_pickup, carry, back, P : np.ndarray) -> np.ndarray:
+        #[R,len(P)] time [s] each robot would be back on its goal after also delivering package P, charge respected
+        velocity = np.array([r.velocity for r in robots], dtype = float)[:,None]
+        route = to_pickup[state.at][:,P] + carry[P][None,:]
+        finish = state.time[:,None] + (route + back[P].T) / velocity
+        if self.f_dist2charge is not None:
+            charge = np.array([getattr(r, 'charge', np.inf) for r in robots], dtype = float)[:,None]
+            flat = self.f_dist2charge(state.used[:,None] + route + back[P].T) > charge
+            finish = finish + INFEASIBLE * flat
+        return finish
+
+    def allocate(self, env : enviorment, robots : list) -> dict[int, list[int]]:
+        D = shortest_distances(len(env.locations), env.connectivityList, env.edge_lengths)
+        to_pickup, carry, back = self.cost_matrices(env, robots, D)
+        packages = env.packages or []
+        state = allocation_state(robots)
+        velocity = np.array([r.velocity for r in robots], dtype = float)
+        assignment = {r.id : [] for r in robots}
+
+        def give(r : int, p : int):
+            route = to_pickup[state.at[r], p] + carry[p]
+            state.time[r] += route / velocity[r]
+            state.used[r] += route
+            state.at[r] = packages[p].goal
+            assignment[robots[r].id].append(packages[p].id)
+
+        #packages on robots stay with them, and those at their goal need no one
+        left = []
+        for p in packages:
+            if p.owner_type == 'robot':
+                give(p.owner, p.id)
+            elif p.owner != p.goal:
+                left.append(p.id)
+
+        while len(left) > 0:
+            cost = self.bids(state, robots, to_pickup, carry, back, np.array(left))
+            if self.method == 'auction':
+                r, k = np.unravel_index(np.argmin(cost), cost.shape)
+                pairs = [(int(r), int(k))]
+            else:
+                pairs = min_cost_matching(cost)
+            for r, k in pairs:
+                give(r, left[k])
+            taken = {k for _, k in pairs}
+            left = [p for k, p in enumerate(left) if k not in taken]
+        return assignment
+
+    def robot_problem(self, env : enviorment, robots : list, r, packages : list[int]) -> region_problem:
+        #r's packages on the map without where the other robots start and end, unless that cuts r off
+        hops = [(env.packages[p], (env.packages[p].owner_type, env.packages[p].owner), env.packages[p].goal) for p in packages]
+        needed = {r.last_location, r.goal_location} | {h[2] for h in hops} | {h[1][1] for h in hops if h[1][0] == 'location'}
+        parked = {l for o in robots if o is not r for l in [o.last_location, o.goal_location]} - needed
+        nodes = set(range(len(env.locations))) - parked
+        if not reachable(env, nodes, r.last_location) >= needed:
+            nodes = set(range(len(env.locations)))
+        return region_problem(env, nodes, [r], hops)
+
+    def solve(self, env : enviorment, robots : list, backWithCharge = False, **solve_options):
+        '''
+        the plan of all robots on env, as robot_planner.solve returns it. solve_options are those of
+        robot_planner.solve, every robot gets them. raises the solve_error of a robot that could not be planned,
+        or of merged plans that still collide
+        '''
+        solve_options.pop('time_fix', None) #plans are merged on the solvers' times
+        self.assignment = self.allocate(env, robots)
+        problems = {r.id : self.robot_problem(env, robots, r, self.assignment[r.id]) for r in robots \
+                    if len(self.assignment[r.id]) > 0 or r.last_location != r.goal_location}
+        pool = self.worker_pool(len(problems)) if len(problems) > 0 else None
+        futures = {id : pool.submit(sub.env, sub.agents, [], brain = self.brain, backWithCharge = backWithCharge, \
+                    time_fix = False, **solve_options) for id, sub in problems.items()}
+        plans = []
+        for id, future in futures.items():
+            execution_times, actions, durations = future.result()
+            plans.append((execution_times, problems[id].restore(actions), durations))
+        return merge(plans, robots)
+
+def reachable(env : enviorment, nodes : set[int], start : int) -> set[int]:
+    seen, stack = {start}, [start]
+    while stack:
+        n = stack.pop()
+        for m in env.find_adjacent(env.locations[n]):
+            if m in nodes and m not in seen:
+                seen.add(m)
+                stack.append(m)
+    return seen
+
+def merge(plans : list[tuple[list, list, list]], robots : list) -> tuple[list, list, list]:
+    '''
+    one plan of plans, longest first. a plan that collides with those merged so far starts at the earliest end
+    of a merged action that avoids it
+    '''
+    plan = ([], [], [])
+    for execution_times, actions, durations in sorted(plans, key = lambda x: -max([e + d for e, d in zip(x[0], x[2])] + [0.0])):
+        first = min(execution_times + [0.0])
+        for offset in sorted({0.0} | {e + d for e, d in zip(plan[0], plan[2])}):
+            candidate = ([e - first + offset for e in execution_times], actions, durations)
+            if len(collisions(plan[0] + candidate[0], plan[1] + candidate[1], plan[2] + candidate[2], robots)) == 0:
+                break
+        for x, y in zip(plan, candidate):
+            x += y
+    found = collisions(*plan, robots)
+    if len(found) > 0:
+        raise solve_error(solve_result('allocation_planner', 'unsolvable', stats = {'collisions' : found}))
+    plan = sorted(zip(*plan), key = lambda x: x[0])
+    return [x[0] for x in plan], [x[1] for x in plan], [x[2] for x in plan]
@@ -0,0 +1,284 @@
+'''
+what the three brains share: building the problem of a scenario on the domain domain_generator compiles, solving
+it and turning the plan back into moves on the scenario's map. a brain is a base_planner with the domain features
+it plans with at most (FEATURES, see domain_generator) and the create_problem() arguments of its scenarios.
+'''
+from maildelivery.agents import robot, drone
+from maildelivery.world import enviorment
+from maildelivery.binary_solvers import manipulate_pddls
+from maildelivery.binary_solvers.workspace import workspace, shared_workspace
+from maildelivery.binary_solvers.optic import optic_wrapper
+from maildelivery.binary_solvers.lpg import lpg_wrapper
+from maildelivery.binary_solvers import portfolio
+from maildelivery.binary_solvers.result import solve_result, solve_error
+from maildelivery.binary_solvers.plan_cache import plan_cache
+from maildelivery.binary_solvers import telemetry
+from maildelivery.brains.plan_parser import parse_up, plain_plan, expand_macros
+from maildelivery.brains import pddl_emitter, domain_generator, graph_reduction, grounding, macro_moves
+from maildelivery.brains.domain_generator import NOT_CONNECTED_DISTANCE
+
+import unified_planning as up
+from unified_planning.shortcuts import OneshotPlanner, Problem
+from unified_planning.io.pddl_writer import PDDLWriter
+import time
+from unified_planning.model.metrics import MinimizeMakespan
+up.shortcuts.get_env().credits_stream = None #removes the printing planners credits
+
+
+class base_planner:
+
+    FEATURES = domain_generator.FEATURES #domain features the brain plans with at most, see domain_generator
+
+    def __init__(self) -> None:
+        if 'charge' in self.FEATURES:
+            #constants that apply to all robots
+            self.f_dist2charge  = lambda dist: 2 * dist
+            self.f_charge2time = lambda missing_charge: missing_charge/100
+            self.max_charge = 100.0
+        self.last_result = None #solve_result of the last solve()
+        self.last_record = None #telemetry.solve_record of the last solve()
+        self.last_report = None #grounding.grounding_report of the last solve() given limits
+        self.build_time = None #[s] of the last create_problem()
+        self.problem_args = None #of the last create_problem()
+        self.scenario = None #create_problem()'s own arguments, to create it again
+        self.reduction = None #graph_reduction.reduced_map of the last create_problem(reduce_map = True)
+        self.robot_names = []
+        self.create_domain()
+
+    def create_domain(self, features : frozenset = None, levels : int = None) -> None:
+        #compiled once per process for each feature set and set of domain parameters and shared between planners
+        features = self.FEATURES if features is None else features
+        if 'charge' in features:
+            self.domain = domain_generator.domain(features, self.max_charge, self.f_dist2charge, self.f_charge2time, levels)
+        else:
+            self.domain = domain_generator.domain(features)
+        self.domain.bind(self)
+
+    @property
+    def problem(self) -> Problem:
+        #the unified_planning problem of the last create_problem(), built on first use
+        if self._problem is None:
+            self.build_problem(**self.problem_args)
+        return self._problem
+
+    @problem.setter
+    def problem(self, problem : Problem):
+        self._problem = problem
+
+    def create_scenario(self, env : enviorment, robots : list[robot], drones : list[drone] = [], backWithCharge = False, \
+                        prune = True, reduce_map = False, road_objects = False, charge_levels : int = None, macro_moves = False):
+        #only remembers the scenario. optic and lpg get their pddl from pddl_emitter, the unified_planning
+        #problem is built when planner.problem is first used (tamer, or editing it by hand).
+        #prune plans on a domain without the features the scenario doesn't need, prune = False on this brain's full one.
+        #reduce_map plans on the road graph graph_reduction prunes and contracts, solve() still returns moves on env.
+        #road_objects plans on the roads encoding of the domain, charge_levels on charge in that many levels,
+        #macro_moves on moves between key locations, see domain_generator. brains' create_problem() end here
+        self.scenario = {'env' : env, 'robots' : robots, 'drones' : drones, 'backWithCharge' : backWithCharge, 'reduce_map' : reduce_map, \
+                         'road_objects' : road_objects, 'charge_levels' : charge_levels, \
+                         'macro_moves' : macro_moves}
+        self.reduction = graph_reduction.reduce(env, robots, drones) if reduce_map else None
+        if self.reduction is not None:
+            env, robots, drones = self.reduction.env, self.reduction.robots, self.reduction.drones
+        features = domain_generator.scenario_features(env, robots, drones, backWithCharge, \
+                                                      getattr(self, 'f_dist2charge', None)) & self.FEATURES \
+                    if prune else self.FEATURES
+        if road_objects:
+            features |= {'roads'}
+        if charge_levels is not None and 'charge' in features:
+            features |= {'charge_levels'}
+        if macro_moves:
+            features |= {'macros'}
+        self.create_domain(features, charge_levels)
+        self.problem_args = {'env' : env, 'robots' : robots, 'drones' : drones, 'backWithCharge' : backWithCharge}
+        self.robot_names = [f"r{bot.id}" for bot in robots]
+        self._problem = None
+        self.build_time = 0.0
+
+    def build_problem(self, env : enviorment, robots : list[robot], drones : list[drone] = [], backWithCharge = False):
+        start = time.time()
+        #planners can be reused, each problem starts fresh
+        self.problem, objects = domain_generator.build_problem(self.domain, env, robots, drones, backWithCharge)
+        self._robots = objects['_robots']
+        self._locations = objects['_locations']
+        self._packages = objects['_packages']
+        self.build_time = time.time() - start
+
+    def solve(self, engine_name = 'optic', only_read_plan = False, time_fix = True,\
+                         minimize_makespan = True, maximize_charge = False, lpg_n = 3,\
+                         deadline = None, portfolio_policy = 'best',\
+                         on_incumbent = None, metric_cutoff = None,\
+                         memory_limit = None, cache : plan_cache = None, lpg_seeds = None,\
+                         telemetry_sink = None, limits : grounding.grounding_limits = None):
+
+        start = time.time()
+        solve_options = {k : v for k, v in locals().items() if k not in ['self', 'start']} #to plan again, see below
+
+        if maximize_charge and 'charge' not in self.FEATURES:
+            raise ValueError('maximize_charge needs a brain that plans charge')
+        if maximize_charge and not minimize_makespan and \
+                ('charge' not in self.domain.features or 'charge_levels' in self.domain.features):
+            #create_problem() pruned the charge away, or made it levels with no number to maximize
+            self.create_scenario(**dict(self.scenario, charge_levels = None), prune = False)
+
+        #---------------------------------------------------------------------------#
+        #                            DEFINE   METRIC                                #
+        #---------------------------------------------------------------------------#
+
+        #optic and lpg read the problem pddl_emitter writes straight from create_problem()'s scenario,
+        #unless planner.problem was already built (and maybe edited)
+        emit = engine_name in ['optic', 'lpg', 'portfolio'] and self._problem is None
+        if minimize_makespan and not emit:
+            self.problem.add_quality_metric(metric =  MinimizeMakespan())
+            # problem.add_quality_metric(metric = MinimizeActionCosts({
+            #                                                         _move: Int(1),
+            #                                                         _pickup: Int(0),
+            #                                                         _drop: Int(0)
+            #                                                         }))
+
+        result = None
+        cache_key = None
+        cache_hit = False
+        write_time = 0.0
+        static_time = 0.0 #[s] building the map's facts for the emitter
+        if limits is not None:
+            #problems above the limits are refused before a solver hangs on them, see grounding.analyze
+            self.last_report = grounding.analyze(self, limits)
+            if self.last_report.recommendation == 'refuse':
+                result = solve_result(engine_name, 'refused', solve_time = 0.0)
+
+        if result is None and engine_name in ['optic', 'lpg', 'portfolio']:
+            #building the problem is the map's static facts for the emitter (cached per map), the unified_planning
+            #problem otherwise. both are reported as build time, what is left of emitting and writing as write time
+            if emit:
+                t = time.time()
+                pddl_emitter.static_block(self.domain, self.problem_args['env'], self.problem_args['robots'], \
+                                            self.problem_args['drones'], {'distance' : NOT_CONNECTED_DISTANCE})
+                static_time = time.time() - t
+            else:
+                self.problem #built on first use
+            t = time.time()
+            domain = self.domain.pddl_domain
+            #pairs create_problem() gave no distance are left undefined, so the solvers don't ground them
+            if emit:
+                problem = pddl_emitter.emit_problem(self.domain, **self.problem_args, minimize_makespan = minimize_makespan, \
+                                                    omit = {'distance' : NOT_CONNECTED_DISTANCE})
+            else:
+                problem = PDDLWriter(self.problem).get_problem()
+                problem = manipulate_pddls.remove_init_values(problem, 'distance', NOT_CONNECTED_DISTANCE)
+
+            if minimize_makespan == False and maximize_charge == True:
+                # add optimization over final values here via rewriting the pddl.
+                if len(self.robot_names) == 1:
+                    problem = manipulate_pddls.add_lines_to_problem(problem, [f' (:metric maximize (charge {self.robot_names[0]}))'])
+                else:
+                    part1 = ' (:metric maximize (+ '
+                    part2 = ' '.join([f'(charge {rname})' for rname in self.robot_names])
+                    part3 = '))'
+                    newline = part1 + part2 + part3
+                    problem = manipulate_pddls.add_lines_to_problem(problem, [newline])
+
+            write_time = time.time() - t
+
+            #problems solved before with the same engine and options are read from the cache, skipping the solver
+            if cache is not None and not only_read_plan:
+                cache_key = cache.key(domain, problem, engine_name, lpg_n = lpg_n, lpg_seeds = lpg_seeds, \
+                                        portfolio_policy = portfolio_policy, metric_cutoff = metric_cutoff)
+                result = cache.get(cache_key)
+                if result is not None:
+                    cache_hit = True
+                    cache_key = None #nothing to store
+
+            if result is None:
+                #each solve gets its own workspace so solves can run concurrently.
+                #only_read_plan reads the plan left in the shared package directory
+                t = time.time()
+                ws = shared_workspace() if only_read_plan else workspace()
+                ws.write_pddls(domain, problem)
+                write_time += time.time() - t
+
+        #---------------------------------------------------------------------------#
+        #                            Call ENGINE                                    #
+        #---------------------------------------------------------------------------#
+
+        if result is None and engine_name in ['optic', 'lpg']:
+            wrapper = optic_wrapper if engine_name == 'optic' else lpg_wrapper
+            try:
+                if only_read_plan:
+                    result = solve_result(engine_name, 'solved', True, *wrapper.get_plan(ws.plan_path))
+                else:
+                    #anytime: every improving plan is handed to on_incumbent as soon as it is found.
+                    #the search stops when on_incumbent returns True, at the deadline [s], once the solver's
+                    #metric reaches metric_cutoff or when it runs out of memory_limit [MB]
+                    options = {'n_user' : lpg_n} if engine_name == 'lpg' else {}
+                    if engine_name == 'lpg' and lpg_seeds is not None:
+                        #one lpg per seed (a count or a list of seeds) on its own core, racing as a portfolio of lpgs
+                        result = portfolio.solve(ws, engines = ('lpg',), deadline = deadline, lpg_n = lpg_n, \
+                                    memory_limit = memory_limit, metric_cutoff = metric_cutoff, \
+                                    on_incumbent = on_incumbent, lpg_seeds = lpg_seeds)
+                    else:
+                        result = wrapper.solve(ws, deadline = deadline, memory_limit = memory_limit, \
+                                    metric_cutoff = metric_cutoff, on_incumbent = on_incumbent, **options)
+            finally:
+                ws.cleanup()
+
+        if result is None and engine_name == 'portfolio':
+            #optic, lpg and tamer race on the same problem, see portfolio.solve for deadline and policy.
+            #tamer gets the distances left out above back
+            try:
+                result = portfolio.solve(ws, deadline = deadline, policy = portfolio_policy, lpg_n = lpg_n, \
+                                            memory_limit = memory_limit, metric_cutoff = metric_cutoff, \
+                                            on_incumbent = on_incumbent, lpg_seeds = lpg_seeds, \
+                                            tamer_defaults = {'distance' : NOT_CONNECTED_DISTANCE})
+            finally:
+                ws.cleanup()
+
+        if result is None and engine_name == 'tamer':
+            #runs in process, so deadline and memory_limit do not apply
+            with OneshotPlanner(name='tamer') as engine:
+                up_result = engine.solve(self.problem)
+            if up_result.plan is None:
+                result = solve_result('tamer', 'unsolvable', solve_time = time.time() - start)
+            else:
+                t = time.time()
+                plan = parse_up(up_result.plan.timed_actions)
+                result = solve_result('tamer', 'solved', True, *plan, solve_time = t - start, \
+                                        parse_time = time.time() - t)
+
+        #only complete solves are cached. plans picked by on_incumbent depend on the callback, and a best plan
+        #of runs the deadline cut off (stats['cut_off'], see portfolio.solve) may not be the best with more time
+        if cache_key is not None and result.status == 'solved' and on_incumbent is None and \
+                'cut_off' not in result.stats:
+            cache.put(cache_key, result)
+
+        #a plan left by a solver that timed out is still returned, last_result.status tells
+        self.last_result = result
+        self.last_record = telemetry.record(engine_name, result, self.build_time + static_time, write_time, \
+                                            time.time() - start, cache_hit)
+        telemetry.emit(self.last_record, telemetry_sink)
+        if not result.found:
+            raise solve_error(result)
+        execution_times, actions, durations = result.plan()
+        if self.domain.features & domain_generator.ENCODINGS:
+            execution_times, actions, durations = plain_plan(execution_times, actions, durations)
+        if 'macros' in self.domain.features:
+            #macro moves become the moves along their paths
+            execution_times, actions, durations = expand_macros(execution_times, actions, durations, \
+                macro_moves.paths_of(self.problem_args['env'], self.problem_args['robots'], self.problem_args['drones']))
+
+        #with charge pruned away the plan may drive a robot flat, then plan again with it
+        if 'charge' not in self.domain.features and 'charge' in self.FEATURES and \
+                domain_generator.charge_exceeded(actions, self.problem_args['env'], self.problem_args['robots'], self.f_dist2charge):
+            self.create_scenario(**self.scenario, prune = False)
+            return self.solve(**solve_options)
+
+        #---------------------------------------------------------------------------#
+        #                            Wrap it up                                     #
+        #---------------------------------------------------------------------------#
+
+        if self.reduction is not None:
+            execution_times, actions, durations = self.reduction.expand(execution_times, actions, durations)
+
+        if time_fix:
+            execution_times = [execution_times[i] - execution_times[0] for i in range(len(execution_times))]
+
+        return execution_times, actions, durations
@@ -0,0 +1,56 @@
+'''
+charge as levels instead of a number, for solvers that handle numeric fluents poorly. level c of n stands for at
+least c/n of max_charge: a robot starts on the level its charge rounds down to, and a road drains the levels its
+charge rounds up to, so a plan on levels is a plan on the real charge too, it only gives up the charge below the
+levels. a road drains at least one level, so coarse levels lose charge on short roads.
+
+a robot has its reserve (has_reserve) on the levels that cover its return_charge, rounded up, when it has to come back
+with it (backWithCharge), and on every level otherwise. which levels those are is static per robot, so move is split
+in move, ending on such a level, and move_below, ending under it, instead of a conditional effect or a separate
+action dropping levels. chargeup ends on the full level, having the reserve.
+
+chargeup from level c takes f_charge2time of what is missing from level c, never less than the real chargeup.
+
+lpg searches the numeric charge better than levels, every move is grounded once per level it can start from.
+
+    planner.create_problem(env, robots, backWithCharge = True, charge_levels = 100)
+'''
+import math
+from fractions import Fraction
+
+from maildelivery.brains.compiled_domain import function_key
+
+class charge_levels:
+    def __init__(self, levels : int, max_charge : float, f_dist2charge, f_charge2time):
+        if levels < 1:
+            raise ValueError('charge_levels needs at least one level')
+        self.levels = levels
+        self.max_charge = max_charge
+        self.f_dist2charge = f_dist2charge
+        self.f_charge2time = f_charge2time
+        self.key = (levels, max_charge, function_key(f_dist2charge), function_key(f_charge2time))
+
+    def ratio(self, charge : float) -> Fraction:
+        #charge in levels, exactly
+        return Fraction(charge) * self.levels / Fraction(self.max_charge)
+
+    def level(self, charge : float) -> int:
+        #the level a robot with charge is on, rounded down
+        return max(0, min(self.levels, math.floor(self.ratio(charge))))
+
+    def needed(self, charge : float) -> int:
+        #levels that cover spending charge, rounded up
+        return max(0, math.ceil(self.ratio(charge)))
+
+    def drains(self, length : float) -> list[tuple[int,int]]:
+        #(level before, level after) of every level a robot can drive a road of length [m] from
+        d = self.needed(self.f_dist2charge(length))
+        return [(c, c - d) for c in range(d, self.levels + 1)]
+
+    def reserved(self, bot, backWithCharge : bool) -> int:
+        #the lowest level on which bot has its reserve
+        return min(self.levels, self.needed(bot.return_charge)) if backWithCharge else 0
+
+    def charge_time(self, c : int) -> float:
+        #[s] to charge up from level c
+        return self.f_charge2time(self.max_charge - self.max_charge * c / self.levels)
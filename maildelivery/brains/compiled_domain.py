@@ -0,0 +1,95 @@
+import threading
+from typing import Callable, Hashable
+
+from unified_planning.shortcuts import Problem
+from unified_planning.io.pddl_writer import PDDLWriter
+
+_domains = {} #per process: key -> compiled_domain
+_domains_lock = threading.Lock() #planners compile from threads, each domain is compiled once
+
+class compiled_domain:
+    '''
+    types, fluents and actions of a brain, built once per process and shared by all its planners, together with
+    the pddl domain text. read only: problems are instances of it, see instance()
+    '''
+    def __init__(self, problem : Problem, **parts):
+        object.__setattr__(self, '_problem', problem) #actions and fluents only, never objects or goals
+        object.__setattr__(self, '_pddl_domain', None)
+        object.__setattr__(self, 'parts', parts) #types and fluents by the names the brains use for them
+
+    def __setattr__(self, name, value):
+        raise AttributeError('compiled_domain is read only')
+
+    def __getattr__(self, name):
+        try:
+            return self.parts[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    @property
+    def pddl_domain(self) -> str:
+        #the domain text does not depend on objects, initial values, goals or metrics
+        if self._pddl_domain is None:
+            object.__setattr__(self, '_pddl_domain', PDDLWriter(self._problem).get_domain())
+        return self._pddl_domain
+
+    @property
+    def name(self) -> str:
+        return self._problem.name
+
+    @property
+    def types(self) -> list[str]:
+        return [t.name for t in self._problem.user_types]
+
+    @property
+    def fluents(self) -> list[tuple[str, list[str], object]]:
+        #(name, parameter types, default initial value or None) of every fluent, in declaration order
+        defaults = self._problem.fluents_defaults
+        return [(f.name, [p.type.name for p in f.signature], \
+                    defaults[f].constant_value() if f in defaults else None) for f in self._problem.fluents]
+
+    @property
+    def static_fluents(self) -> set[str]:
+        #fluents no action changes, their initial values hold in every state
+        changed = set()
+        for a in self._problem.actions:
+            effects = [e for es in a.effects.values() for e in es] if isinstance(a.effects, dict) else a.effects
+            changed |= {e.fluent.fluent().name for e in effects}
+        return {f.name for f in self._problem.fluents} - changed
+
+    def instance(self) -> Problem:
+        #a problem of this domain to add objects, initial values and goals to
+        return self._problem.clone()
+
+    def bind(self, planner) -> None:
+        #gives planner the types and fluents as attributes, and a fresh problem
+        planner.__dict__.update(self.parts)
+        planner.problem = self.instance()
+
+def function_key(f : Callable) -> Hashable:
+    '''
+    key of what f computes: its code with the values it closes over, its defaults and the globals it reads.
+    lambdas written once and created again per planner share a key, closures over different constants don't.
+    f itself when any of those values is unhashable
+    '''
+    if f is None or not hasattr(f, '__code__'):
+        return f
+    cells = tuple(c.cell_contents for c in f.__closure__ or ())
+    reads = tuple((name, f.__globals__[name]) for name in f.__code__.co_names if name in f.__globals__)
+    key = (f.__module__, f.__qualname__, f.__code__, f.__defaults__, \
+            tuple(sorted((f.__kwdefaults__ or {}).items())), cells, reads)
+    try:
+        hash(key)
+    except TypeError:
+        return f
+    return key
+
+def cached_domain(key : Hashable, compile : Callable[[], compiled_domain]) -> compiled_domain:
+    with _domains_lock:
+        if key not in _domains:
+            _domains[key] = compile()
+        return _domains[key]
+
+def clear_cache() -> None:
+    with _domains_lock:
+        _domains.clear()
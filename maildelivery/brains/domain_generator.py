@@ -0,0 +1,611 @@
+'''
+the maildelivery domain, generated with only the features a scenario needs. the three brains are feature sets
+of it: bots_simple has none, bots_charge_added charge and chargeup, bots_and_drones all of them.
+
+    charge   - robots spend charge when moving, and may have to come back with some (backWithCharge)
+    chargeup - robots recharge on docks
+    drones   - drones fly between locations, only where can_fly, see flights()
+    airlift  - drones carry robots to docks (prep_for_liftoff, drone_fly_robot), only where can_airlift
+
+scenario_features() picks the smallest set that still covers a scenario, so the solvers don't ground actions
+that can never be used.
+
+    roads    - an encoding, not a feature of the scenario: roads are objects, two per connectivityList entry, one
+               each way. move(r, l_from, l_to, rd, back) drives road rd whose opposite is back, so the solvers ground
+               road fluents and moves per road instead of per pair of locations. create_problem(..., road_objects = True)
+    charge_levels - an encoding of charge: levels instead of a number, see charge_levels.
+               create_problem(..., charge_levels = n)
+    macros   - an encoding of move: macro_move{n}(r, l_from, l_to, pth, v1..vn) drives path pth between key locations
+               in one action, passing locations v1..vn, see macro_moves. create_problem(..., macro_moves = True)
+'''
+import itertools
+from fractions import Fraction
+
+import numpy as np
+
+from unified_planning.shortcuts import Fluent, InstantaneousAction, DurativeAction, Problem, Object, \
+        UserType, BoolType, RealType, Real, Div, Minus, \
+        LeftOpenTimeInterval, StartTiming, EndTiming, OpenTimeInterval, GE, Not
+
+from maildelivery.world import enviorment
+from maildelivery.brains.compiled_domain import compiled_domain, cached_domain, function_key
+from maildelivery.brains.charge_levels import charge_levels
+from maildelivery.brains import macro_moves
+
+FEATURES = frozenset(['charge', 'chargeup', 'drones', 'airlift'])
+ENCODINGS = frozenset(['roads', 'charge_levels', 'macros'])
+NOT_CONNECTED_DISTANCE = float(10000) #never written to the pddl problem, see robot_planner.solve()
+
+def scenario_features(env : enviorment, robots, drones = [], backWithCharge = False, f_dist2charge = None) -> frozenset:
+    '''
+    features needed by the scenario. charge is left out when no robot has to come back with charge and every
+    robot can drive the whole road network on what it has, robot_planner.solve checks the plan afterwards.
+    '''
+    docks = any(loc.type == 'dock' for loc in env.locations)
+    features = set()
+    if f_dist2charge is not None:
+        network = float(env.edge_lengths.sum())
+        if backWithCharge or any(bot.charge < f_dist2charge(network) for bot in robots):
+            features.add('charge')
+            if docks:
+                features.add('chargeup')
+    if len(drones) > 0:
+        features.add('drones')
+        if docks:
+            features.add('airlift')
+    return frozenset(features)
+
+def pruned_features(features : frozenset) -> list[frozenset]:
+    #every feature set scenario_features() & features can give, chargeup comes with charge and airlift with drones
+    subsets = [frozenset(f for f, on in zip(sorted(features), mask) if on) \
+                for mask in itertools.product([False, True], repeat = len(features))]
+    return [f for f in subsets if ('chargeup' not in f or 'charge' in f) and ('airlift' not in f or 'drones' in f)]
+
+def domain(features : frozenset, max_charge : float = None, f_dist2charge = None, f_charge2time = None, \
+            levels : int = None) -> compiled_domain:
+    #compiled once per process for each feature set, and charge parameters when it has charge
+    key = (features, max_charge, function_key(f_dist2charge), function_key(f_charge2time)) if 'charge' in features else (features,)
+    if 'charge_levels' in features:
+        key += (levels,)
+    return cached_domain(key, lambda: compile_domain(features, max_charge, f_dist2charge, f_charge2time, levels))
+
+def compile_domain(features : frozenset, max_charge : float = None, f_dist2charge = None, \
+                    f_charge2time = None, levels : int = None) -> compiled_domain:
+    levels_on = 'charge_levels' in features and 'charge' in features
+    charge_on = 'charge' in features and not levels_on
+    chargeup_on = 'chargeup' in features
+    drones_on = 'drones' in features
+    airlift_on = 'airlift' in features
+    roads_on = 'roads' in features
+    macros_on = 'macros' in features
+    if roads_on and macros_on:
+        raise ValueError('roads and macros are both encodings of move, pick one')
+    parts = {}
+
+    _location = UserType('location')
+    _robot = UserType('robot')
+    _package = UserType('package')
+    parts.update(_location = _location, _robot = _robot, _package = _package)
+    if drones_on:
+        _drone = UserType('drone')
+        parts.update(_drone = _drone)
+    if roads_on:
+        _road = UserType('road')
+        parts.update(_road = _road)
+    if macros_on:
+        _path = UserType('path')
+        parts.update(_path = _path)
+    if levels_on:
+        _level = UserType('level')
+        parts.update(_level = _level, levels = charge_levels(levels, max_charge, f_dist2charge, f_charge2time))
+
+    #problem variables that are changed by actions on objects (no floats please, they cause problems to solvers)
+    robot_at = Fluent('robot_at', BoolType(), r = _robot, l = _location)
+    is_connected = Fluent('is_connected', BoolType(), l_from = _location, l_to = _location)
+    location_is_free = Fluent('location_is_free', BoolType(), l = _location)
+        #robot can wait on a location, occupying it, and no robot will pass over
+        #also, we take extra precaution and want robot location to be free "overall" movement towards it
+    road_is_free = Fluent('road_is_free',BoolType(), l_from = _location, l_to = _location)
+        #don't want two robots to go into head on collision
+    robot_has_package = Fluent('robot_has_package', BoolType(), p = _package, r = _robot)
+        #robot has a specific package, to allow for drop actions
+    robot_not_holding_package = Fluent('robot_not_holding_package', BoolType(), r = _robot)
+        #to prevent picking up more than one package
+    location_has_package = Fluent('location_has_package', BoolType(), p = _package, l = _location)
+    distance = Fluent('distance', RealType(), l_from = _location, l_to = _location)
+    if roads_on:
+        road_from = Fluent('road_from', BoolType(), rd = _road, l = _location)
+        road_to = Fluent('road_to', BoolType(), rd = _road, l = _location)
+        road_opposite = Fluent('road_opposite', BoolType(), rd = _road, back = _road)
+        road_length = Fluent('road_length', RealType(), rd = _road)
+        road_is_free = Fluent('road_is_free', BoolType(), rd = _road)
+    if macros_on:
+        path_from = Fluent('path_from', BoolType(), pth = _path, l = _location)
+        path_to = Fluent('path_to', BoolType(), pth = _path, l = _location)
+        path_step = [Fluent(f'path_step{i}', BoolType(), pth = _path, l = _location) \
+                        for i in range(1, macro_moves.MAX_PASSED + 2)]
+            #static, path_step{i} the location a path reaches on its i-th road
+        path_length = Fluent('path_length', RealType(), pth = _path)
+    robot_velocity = Fluent('robot_velocity', RealType(), r = _robot)
+    if charge_on:
+        charge = Fluent('charge', RealType(0.0,max_charge), r = _robot)
+    if levels_on:
+        charge_level = Fluent('charge_level', BoolType(), r = _robot, c = _level)
+        has_reserve = Fluent('has_reserve', BoolType(), r = _robot)
+        level_reserved = Fluent('level_reserved', BoolType(), r = _robot, c = _level)
+        level_short = Fluent('level_short', BoolType(), r = _robot, c = _level)
+            #static, the levels on which the robot has its reserve and the ones below, see charge_levels
+        if roads_on:
+            road_drain = Fluent('road_drain', BoolType(), rd = _road, c_from = _level, c_to = _level)
+        elif macros_on:
+            path_drain = Fluent('path_drain', BoolType(), pth = _path, c_from = _level, c_to = _level)
+        else:
+            level_drain = Fluent('level_drain', BoolType(), l_from = _location, l_to = _location, c_from = _level, c_to = _level)
+        if chargeup_on:
+            level_full = Fluent('level_full', BoolType(), c = _level)
+            charge_time = Fluent('charge_time', RealType(), c = _level)
+    if chargeup_on:
+        location_is_dock = Fluent('location_is_dock', BoolType(), l = _location)
+    if drones_on:
+        drone_at = Fluent('drone_at', BoolType(), d = _drone, l = _location)
+        drone_velocity = Fluent('drone_velocity', RealType(), d = _drone)
+        can_fly = Fluent('can_fly', BoolType(), l_from = _location, l_to = _location)
+            #static, so the solvers only ground flights that can happen
+    if airlift_on:
+        robot_ready_for_liftoff = Fluent('robot_ready_for_liftoff', BoolType(), r = _robot)
+        can_airlift = Fluent('can_airlift', BoolType(), l_from = _location, l_to = _location)
+
+    if macros_on:
+        #robots drive whole paths between key locations, reserving the locations and roads they pass as move does.
+        #one macro_move{n} for paths passing n locations, see macro_moves
+        _moves = []
+        for n in range(macro_moves.MAX_PASSED + 1):
+            move_parameters = dict(r = _robot, l_from = _location, l_to = _location, pth = _path, \
+                                   **{f'v{i}' : _location for i in range(1, n + 1)})
+            if levels_on:
+                move_parameters.update(c_from = _level, c_to = _level)
+            _move = DurativeAction(f'macro_move{n}', **move_parameters)
+            r = _move.parameter('r')
+            l_from = _move.parameter('l_from')
+            l_to = _move.parameter('l_to')
+            pth = _move.parameter('pth')
+            via = [_move.parameter(f'v{i}') for i in range(1, n + 1)]
+            stops = [l_from] + via + [l_to]
+            _move.set_fixed_duration(Div(path_length(pth),(robot_velocity(r))))
+            _move.add_condition(StartTiming(), path_from(pth, l_from))
+            _move.add_condition(StartTiming(), path_to(pth, l_to))
+            for i, v in enumerate(via + [l_to]):
+                _move.add_condition(StartTiming(), path_step[i](pth, v))
+            if charge_on:
+                _move.add_condition(StartTiming(),GE(charge(r),f_dist2charge(path_length(pth))))
+            if levels_on:
+                c_from = _move.parameter('c_from')
+                c_to = _move.parameter('c_to')
+                _move.add_condition(StartTiming(), path_drain(pth, c_from, c_to))
+                _move.add_condition(StartTiming(), charge_level(r, c_from))
+            for u, w in zip(stops[:-1], stops[1:]):
+                _move.add_condition(OpenTimeInterval(StartTiming(), EndTiming()), road_is_free(w, u)) #opposite way
+            for v in via:
+                _move.add_condition(StartTiming(), location_is_free(v))
+            _move.add_condition(StartTiming(), robot_at(r, l_from))
+            _move.add_condition(LeftOpenTimeInterval(StartTiming(), EndTiming()),location_is_free(l_to))
+            _move.add_effect(StartTiming(),robot_at(r, l_from), False)
+            _move.add_effect(StartTiming(),location_is_free(l_from), True)
+            for u, w in zip(stops[:-1], stops[1:]):
+                _move.add_effect(StartTiming(), road_is_free(u, w), False)
+                _move.add_effect(EndTiming(), road_is_free(u, w), True)
+            for v in via:
+                _move.add_effect(StartTiming(), location_is_free(v), False)
+                _move.add_effect(EndTiming(), location_is_free(v), True)
+            _move.add_effect(EndTiming(),robot_at(r, l_to), True)
+            _move.add_effect(EndTiming(),location_is_free(l_to), False)
+            if charge_on:
+                _move.add_decrease_effect(EndTiming(),charge(r),f_dist2charge(path_length(pth)))
+            if levels_on:
+                _move.add_effect(StartTiming(), charge_level(r, c_from), False)
+                _move.add_effect(EndTiming(), charge_level(r, c_to), True)
+            if airlift_on:
+                _move.add_effect(StartTiming(),robot_ready_for_liftoff(r), False)
+            _moves.append(_move)
+    else:
+        #locations stay the 2nd and 3rd parameters, plans read the same in every encoding
+        move_parameters = dict(r = _robot, l_from = _location, l_to = _location)
+        if roads_on:
+            move_parameters.update(rd = _road, back = _road)
+        if levels_on:
+            move_parameters.update(c_from = _level, c_to = _level)
+        _move = DurativeAction('move', **move_parameters)
+        if roads_on:
+            rd = _move.parameter('rd')
+            back = _move.parameter('back')
+        if levels_on:
+            c_from = _move.parameter('c_from')
+            c_to = _move.parameter('c_to')
+        r = _move.parameter('r')
+        l_from = _move.parameter('l_from')
+        l_to = _move.parameter('l_to')
+        length = road_length(rd) if roads_on else distance(l_from,l_to)
+        _move.set_fixed_duration(Div(length,(robot_velocity(r))))
+        if roads_on:
+            _move.add_condition(StartTiming(), road_from(rd, l_from))
+            _move.add_condition(StartTiming(), road_to(rd, l_to))
+            _move.add_condition(StartTiming(), road_opposite(rd, back))
+        else:
+            _move.add_condition(StartTiming(), is_connected(l_from, l_to))
+        if charge_on:
+            _move.add_condition(StartTiming(),GE(charge(r),f_dist2charge(length)))
+        if levels_on:
+            _move.add_condition(StartTiming(), road_drain(rd, c_from, c_to) if roads_on else level_drain(l_from, l_to, c_from, c_to))
+            _move.add_condition(StartTiming(), charge_level(r, c_from))
+        if roads_on:
+            _move.add_condition(OpenTimeInterval(StartTiming(), EndTiming()), road_is_free(back)) #opposite way
+        else:
+            _move.add_condition(OpenTimeInterval(StartTiming(), EndTiming()), road_is_free(l_to,l_from)) #opposite way
+        _move.add_condition(StartTiming(), robot_at(r, l_from))
+        _move.add_condition(LeftOpenTimeInterval(StartTiming(), EndTiming()),location_is_free(l_to))
+        _move.add_effect(StartTiming(),robot_at(r, l_from), False)
+        _move.add_effect(StartTiming(),location_is_free(l_from), True)
+        _move.add_effect(StartTiming(), road_is_free(rd) if roads_on else road_is_free(l_from,l_to), False)
+        _move.add_effect(EndTiming(),robot_at(r, l_to), True)
+        _move.add_effect(EndTiming(),location_is_free(l_to), False)
+        _move.add_effect(EndTiming(), road_is_free(rd) if roads_on else road_is_free(l_from,l_to), True)
+        if charge_on:
+            _move.add_decrease_effect(EndTiming(),charge(r),f_dist2charge(length))
+        if levels_on:
+            _move.add_effect(StartTiming(), charge_level(r, c_from), False)
+            _move.add_effect(EndTiming(), charge_level(r, c_to), True)
+        if airlift_on:
+            _move.add_effect(StartTiming(),robot_ready_for_liftoff(r), False)
+        _moves = [_move]
+
+    _pickup = InstantaneousAction('pickup', p = _package, r = _robot, l = _location)
+    p = _pickup.parameter('p')
+    r = _pickup.parameter('r')
+    l = _pickup.parameter('l')
+    _pickup.add_precondition(robot_at(r, l))
+    _pickup.add_precondition(location_has_package(p, l))
+    _pickup.add_precondition(robot_not_holding_package(r))
+    _pickup.add_effect(location_has_package(p, l), False)
+    _pickup.add_effect(robot_has_package(p, r), True)
+    _pickup.add_effect(robot_not_holding_package(r), False)
+    if airlift_on:
+        _pickup.add_effect(robot_ready_for_liftoff(r), False)
+
+    _drop = InstantaneousAction('drop', p = _package, r = _robot, l = _location)
+    p = _drop.parameter('p')
+    r = _drop.parameter('r')
+    l = _drop.parameter('l')
+    _drop.add_precondition(robot_at(r, l))
+    _drop.add_precondition(robot_has_package(p, r))
+    _drop.add_effect(robot_has_package(p, r), False)
+    _drop.add_effect(location_has_package(p, l), True)
+    _drop.add_effect(robot_not_holding_package(r), True)
+    if airlift_on:
+        _drop.add_effect(robot_ready_for_liftoff(r), False)
+
+    actions = []
+    for _move in _moves:
+        actions.append(_move)
+        if levels_on:
+            #a move ending on a level with the robot's reserve keeps it, move_below takes it away
+            _move_below = _move.clone()
+            _move_below.name = f"{_move.name}_below"
+            r = _move.parameter('r')
+            c_to = _move.parameter('c_to')
+            _move.add_condition(StartTiming(), level_reserved(r, c_to))
+            _move.add_effect(EndTiming(), has_reserve(r), True)
+            _move_below.add_condition(StartTiming(), level_short(r, c_to))
+            _move_below.add_effect(EndTiming(), has_reserve(r), False)
+            actions.append(_move_below)
+    actions += [_pickup, _drop]
+
+    if chargeup_on and levels_on:
+        _chargeup = DurativeAction('chargeup', r = _robot, l = _location, c = _level, c_full = _level)
+        r = _chargeup.parameter('r')
+        l = _chargeup.parameter('l')
+        c = _chargeup.parameter('c')
+        c_full = _chargeup.parameter('c_full')
+        _chargeup.set_fixed_duration(charge_time(c))
+        _chargeup.add_condition(StartTiming(),robot_at(r, l))
+        _chargeup.add_condition(StartTiming(), location_is_dock(l))
+        _chargeup.add_condition(StartTiming(), charge_level(r, c))
+        _chargeup.add_condition(StartTiming(), level_full(c_full))
+        _chargeup.add_effect(StartTiming(), charge_level(r, c), False)
+        _chargeup.add_effect(EndTiming(), charge_level(r, c_full), True)
+        _chargeup.add_effect(EndTiming(), has_reserve(r), True)
+    elif chargeup_on:
+        _chargeup = DurativeAction('chargeup', r = _robot, l = _location)
+        r = _chargeup.parameter('r')
+        l = _chargeup.parameter('l')
+        _chargeup.set_fixed_duration(f_charge2time(Minus(max_charge,charge(r))))
+        _chargeup.add_condition(StartTiming(),robot_at(r, l))
+        _chargeup.add_condition(StartTiming(), location_is_dock(l))
+        _chargeup.add_effect(EndTiming(), charge(r), max_charge)
+    if chargeup_on:
+        if airlift_on:
+            _chargeup.add_effect(StartTiming(), robot_ready_for_liftoff(r), False)
+        actions.append(_chargeup)
+
+    if drones_on:
+        _drone_fly = DurativeAction('drone_fly',  d = _drone, l_from = _location, l_to = _location)
+        d = _drone_fly.parameter('d')
+        l_from = _drone_fly.parameter('l_from')
+        l_to = _drone_fly.parameter('l_to')
+        _drone_fly.set_fixed_duration(Div(distance(l_from,l_to),(drone_velocity(d))))
+        _drone_fly.add_condition(StartTiming(), can_fly(l_from, l_to))
+        _drone_fly.add_condition(StartTiming(), drone_at(d, l_from))
+        _drone_fly.add_effect(StartTiming(),drone_at(d, l_from), False)
+        _drone_fly.add_effect(EndTiming(), drone_at(d, l_to), True)
+        actions.append(_drone_fly)
+
+    if airlift_on:
+        _prep_for_liftoff = InstantaneousAction('prep_for_liftoff', r = _robot)
+        r = _prep_for_liftoff.parameter('r')
+        _prep_for_liftoff.add_precondition(Not(robot_ready_for_liftoff(r)))
+        _prep_for_liftoff.add_precondition(robot_not_holding_package(r))
+        _prep_for_liftoff.add_effect(robot_ready_for_liftoff(r), True)
+
+        _drone_fly_robot = DurativeAction('drone_fly_robot',  d = _drone, r = _robot, l_from = _location, l_to = _location)
+        d = _drone_fly_robot.parameter('d')
+        r = _drone_fly_robot.parameter('r')
+        l_from = _drone_fly_robot.parameter('l_from')
+        l_to = _drone_fly_robot.parameter('l_to')
+        _drone_fly_robot.set_fixed_duration(Div(distance(l_from,l_to),(drone_velocity(d))))
+        _drone_fly_robot.add_condition(StartTiming(), robot_ready_for_liftoff(r))
+        _drone_fly_robot.add_condition(StartTiming(), can_airlift(l_from, l_to)) #to docks only
+        _drone_fly_robot.add_condition(StartTiming(), robot_at(r, l_from))
+        _drone_fly_robot.add_condition(StartTiming(), drone_at(d, l_from))
+        _drone_fly_robot.add_condition(EndTiming(),location_is_free(l_to))
+        _drone_fly_robot.add_effect(StartTiming(), robot_ready_for_liftoff(r), False)
+        _drone_fly_robot.add_effect(StartTiming(),robot_at(r, l_from), False)
+        _drone_fly_robot.add_effect(StartTiming(),drone_at(d, l_from), False)
+        _drone_fly_robot.add_effect(StartTiming(),location_is_free(l_from), True)
+        _drone_fly_robot.add_effect(EndTiming(),robot_at(r, l_to), True)
+        _drone_fly_robot.add_effect(EndTiming(), drone_at(d, l_to), True)
+        _drone_fly_robot.add_effect(EndTiming(),location_is_free(l_to), False)
+        actions += [_drone_fly_robot, _prep_for_liftoff]
+
+    problem = Problem('maildelivery')
+    for a in actions:
+        problem.add_action(a)
+    problem.add_fluent(robot_at, default_initial_value = False)
+    if not (roads_on or macros_on):
+        problem.add_fluent(is_connected, default_initial_value = False)
+        parts.update(is_connected = is_connected)
+    problem.add_fluent(location_is_free, default_initial_value = True)
+    problem.add_fluent(robot_has_package, default_initial_value = False)
+    problem.add_fluent(location_has_package, default_initial_value = False)
+    problem.add_fluent(robot_not_holding_package, default_initial_value = True)
+    problem.add_fluent(road_is_free, default_initial_value = True)
+    parts.update(road_is_free = road_is_free)
+    if roads_on:
+        problem.add_fluent(road_from, default_initial_value = False)
+        problem.add_fluent(road_to, default_initial_value = False)
+        problem.add_fluent(road_opposite, default_initial_value = False)
+        problem.add_fluent(road_length) #initalized in build_problem()
+        parts.update(road_from = road_from, road_to = road_to, road_opposite = road_opposite, road_length = road_length)
+    if macros_on:
+        problem.add_fluent(path_from, default_initial_value = False)
+        problem.add_fluent(path_to, default_initial_value = False)
+        for f in path_step:
+            problem.add_fluent(f, default_initial_value = False)
+        problem.add_fluent(path_length) #initalized in build_problem()
+        parts.update(path_from = path_from, path_to = path_to, path_length = path_length, \
+                     **{f.name : f for f in path_step})
+    if drones_on or not (roads_on or macros_on):
+        #with roads or macros only drones fly by distance
+        problem.add_fluent(distance, default_initial_value = NOT_CONNECTED_DISTANCE) #set in build_problem() where needed
+        parts.update(distance = distance)
+    problem.add_fluent(robot_velocity) #initalized in build_problem()
+    parts.update(robot_at = robot_at, location_is_free = location_is_free,
+                 robot_has_package = robot_has_package, location_has_package = location_has_package,
+                 robot_not_holding_package = robot_not_holding_package, robot_velocity = robot_velocity)
+    if charge_on:
+        problem.add_fluent(charge) #initalized in build_problem()
+        parts.update(charge = charge)
+    if levels_on:
+        problem.add_fluent(charge_level, default_initial_value = False)
+        problem.add_fluent(has_reserve, default_initial_value = False)
+        problem.add_fluent(level_reserved, default_initial_value = False)
+        problem.add_fluent(level_short, default_initial_value = False)
+        parts.update(charge_level = charge_level, has_reserve = has_reserve, level_reserved = level_reserved, \
+                     level_short = level_short)
+        if roads_on:
+            problem.add_fluent(road_drain, default_initial_value = False)
+            parts.update(road_drain = road_drain)
+        elif macros_on:
+            problem.add_fluent(path_drain, default_initial_value = False)
+            parts.update(path_drain = path_drain)
+        else:
+            problem.add_fluent(level_drain, default_initial_value = False)
+            parts.update(level_drain = level_drain)
+        if chargeup_on:
+            problem.add_fluent(level_full, default_initial_value = False)
+            problem.add_fluent(charge_time) #initalized in build_problem()
+            parts.update(level_full = level_full, charge_time = charge_time)
+    if chargeup_on:
+        problem.add_fluent(location_is_dock, default_initial_value = False)
+        parts.update(location_is_dock = location_is_dock)
+    if drones_on:
+        problem.add_fluent(drone_at, default_initial_value = False)
+        problem.add_fluent(drone_velocity) #initalized in build_problem()
+        problem.add_fluent(can_fly, default_initial_value = False)
+        parts.update(drone_at = drone_at, drone_velocity = drone_velocity, can_fly = can_fly)
+    if airlift_on:
+        problem.add_fluent(robot_ready_for_liftoff, default_initial_value = False)
+        problem.add_fluent(can_airlift, default_initial_value = False)
+        parts.update(robot_ready_for_liftoff = robot_ready_for_liftoff, can_airlift = can_airlift)
+
+    return compiled_domain(problem, features = features, **parts)
+
+def flight_ends(env : enviorment, drones) -> list:
+    #drones only fly to docks (drone_fly_robot) or to where drones start from
+    starts = [d.last_location for d in drones]
+    return [loc for loc in env.locations if loc.type == 'dock' or loc.id in starts]
+
+def robot_reach(env : enviorment, robots) -> np.ndarray:
+    #[L] bool, where robots can be: where they drive to from where they are, or from a dock drones lift them to
+    adjacent = {i : [] for i in range(len(env.locations))}
+    for i, j in env.connectivityList:
+        adjacent[i].append(j)
+        adjacent[j].append(i)
+    reach = np.zeros(len(env.locations), dtype = bool)
+    stack = list({bot.last_location for bot in robots})
+    if len(stack) > 0:
+        stack = list(set(stack) | {loc.id for loc in env.locations if loc.type == 'dock'})
+    reach[stack] = True
+    while stack:
+        for j in adjacent[stack.pop()]:
+            if not reach[j]:
+                reach[j] = True
+                stack.append(j)
+    return reach
+
+def flights(env : enviorment, robots, drones) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    [L,L] can_fly and can_airlift. drones fly between flight ends, and from a flight end to where a robot can be
+    and back. they lift robots from where a robot can be to another dock, islands of roads are joined by docks
+    '''
+    L = len(env.locations)
+    ends = np.zeros(L, dtype = bool)
+    ends[[loc.id for loc in flight_ends(env, drones)]] = True
+    stands = robot_reach(env, robots)
+    docks = np.array([loc.type == 'dock' for loc in env.locations], dtype = bool)
+    apart = ~np.eye(L, dtype = bool)
+    can_fly = (((ends | stands)[:,None] & ends[None,:]) | (ends[:,None] & stands[None,:])) & apart
+    can_airlift = stands[:,None] & docks[None,:] & apart
+    return can_fly, can_airlift
+
+def build_problem(domain : compiled_domain, env : enviorment, robots, drones = [], backWithCharge = False) -> Problem:
+    #the unified_planning problem of a scenario, see pddl_emitter for the fast way to its pddl
+    features = domain.features
+    problem = domain.instance()
+    Nrobots = len(robots)
+
+    _locations = [Object(f"l{id}", domain._location) for id in [loc.id for loc in env.locations]]
+    _robots = [Object(f"r{id}", domain._robot) for id in [bot.id for bot in robots]]
+    _packages = [Object(f"p{id}", domain._package) for id in [p.id for p in env.packages]]
+    _drones = [Object(f"d{id - Nrobots}", domain._drone) for id in [bot.id for bot in drones]] \
+                if 'drones' in features else []
+    _roads = [Object(f"e{k}", domain._road) for k in range(2 * len(env.connectivityList))] \
+                if 'roads' in features else []
+    levels = domain.parts.get('levels')
+    _levels = [Object(f"c{c}", domain._level) for c in range(levels.levels + 1)] if levels is not None else []
+    macros = macro_moves.paths_of(env, robots, drones) if 'macros' in features else None
+    _paths = [Object(f"m{k}", domain._path) for k in range(len(macros))] if macros is not None else []
+
+    problem.add_objects(_locations + _robots + _packages +_drones + _roads + _levels + _paths)
+
+    #only flights drones can make get a distance. roads come after, robots drive their length
+    if 'drones' in features:
+        can_fly, can_airlift = flights(env, robots, drones)
+        distances = env.distances
+        for i, j in zip(*np.nonzero(can_fly | can_airlift)):
+            problem.set_initial_value(domain.distance(_locations[i], _locations[j]), float(distances[i, j]))
+        for i, j in zip(*np.nonzero(can_fly)):
+            problem.set_initial_value(domain.can_fly(_locations[i], _locations[j]), True)
+        if 'airlift' in features:
+            for i, j in zip(*np.nonzero(can_airlift)):
+                problem.set_initial_value(domain.can_airlift(_locations[i], _locations[j]), True)
+
+    #locations connectivity and distance
+    for k, (c, length) in enumerate(zip(env.connectivityList, env.edge_lengths)):
+        if 'roads' in features:
+            #e{2k} drives connectivityList[k] as it is written, e{2k+1} the other way
+            for rd, back, (i, j) in [(2*k, 2*k+1, c), (2*k+1, 2*k, c[::-1])]:
+                problem.set_initial_value(domain.road_from(_roads[rd], _locations[i]), True)
+                problem.set_initial_value(domain.road_to(_roads[rd], _locations[j]), True)
+                problem.set_initial_value(domain.road_opposite(_roads[rd], _roads[back]), True)
+                problem.set_initial_value(domain.road_length(_roads[rd]), float(length))
+        elif 'is_connected' in domain.parts:
+            problem.set_initial_value(domain.is_connected(_locations[c[0]], _locations[c[1]]), True)
+            problem.set_initial_value(domain.is_connected(_locations[c[1]], _locations[c[0]]), True)
+        if 'distance' in domain.parts:
+            problem.set_initial_value(domain.distance(_locations[c[0]], _locations[c[1]]), float(length))
+            problem.set_initial_value(domain.distance(_locations[c[1]], _locations[c[0]]), float(length))
+        if levels is not None and macros is None:
+            #levels left after driving the road from every level it can be driven from
+            for rd, (i, j) in [(2*k, c), (2*k+1, c[::-1])]:
+                for c_from, c_to in levels.drains(length):
+                    if 'roads' in features:
+                        problem.set_initial_value(domain.road_drain(_roads[rd], _levels[c_from], _levels[c_to]), True)
+                    else:
+                        problem.set_initial_value(domain.level_drain(_locations[i], _locations[j], \
+                                                    _levels[c_from], _levels[c_to]), True)
+
+    #paths between key locations, their ends, length and the locations they pass
+    if macros is not None:
+        for k, (path, length) in enumerate(zip(macros.paths, macros.lengths)):
+            problem.set_initial_value(domain.path_from(_paths[k], _locations[path[0]]), True)
+            problem.set_initial_value(domain.path_to(_paths[k], _locations[path[-1]]), True)
+            problem.set_initial_value(domain.path_length(_paths[k]), float(length))
+            for i, l in enumerate(path[1:], 1):
+                problem.set_initial_value(domain.parts[f'path_step{i}'](_paths[k], _locations[l]), True)
+            if levels is not None:
+                for c_from, c_to in levels.drains(length):
+                    problem.set_initial_value(domain.path_drain(_paths[k], _levels[c_from], _levels[c_to]), True)
+
+    if levels is not None and 'chargeup' in features:
+        problem.set_initial_value(domain.level_full(_levels[-1]), True)
+        for c in range(len(_levels)):
+            problem.set_initial_value(domain.charge_time(_levels[c]), levels.charge_time(c))
+
+    # robot at start
+    for r in robots:
+        problem.set_initial_value(domain.robot_at(_robots[r.id], _locations[r.last_location]), True)
+        problem.set_initial_value(domain.location_is_free(_locations[r.last_location]), False)
+        problem.set_initial_value(domain.robot_velocity(_robots[r.id]), robots[r.id].velocity)
+        if 'charge' in domain.parts:
+            problem.set_initial_value(domain.charge(_robots[r.id]), robots[r.id].charge)
+        if levels is not None:
+            problem.set_initial_value(domain.charge_level(_robots[r.id], _levels[levels.level(r.charge)]), True)
+            #the levels with the robot's reserve, see charge_levels
+            reserved = levels.reserved(r, backWithCharge)
+            if levels.level(r.charge) >= reserved:
+                problem.set_initial_value(domain.has_reserve(_robots[r.id]), True)
+            for c in range(len(_levels)):
+                fluent = domain.level_reserved if c >= reserved else domain.level_short
+                problem.set_initial_value(fluent(_robots[r.id], _levels[c]), True)
+
+    if 'drones' in features:
+        for d in drones:
+            problem.set_initial_value(domain.drone_at(_drones[d.id - Nrobots], _locations[d.last_location]), True)
+            problem.set_initial_value(domain.drone_velocity(_drones[d.id - Nrobots]), drones[d.id - Nrobots].velocity)
+
+    #place packages
+    for p in env.packages:
+        if p.owner_type == 'location':
+            problem.set_initial_value(domain.location_has_package(_packages[p.id], _locations[p.owner]), True)
+        elif p.owner_type == 'robot':
+            problem.set_initial_value(domain.robot_has_package(_packages[p.id], _robots[p.owner]), True)
+            problem.set_initial_value(domain.robot_not_holding_package(_robots[p.owner]),False)
+
+    if 'location_is_dock' in domain.parts:
+        for l in env.locations:
+            if l.type == 'dock':
+                problem.set_initial_value(domain.location_is_dock(_locations[l.id]), True)
+    #goal
+    for p in env.packages:
+        problem.add_goal(domain.location_has_package(_packages[p.id],_locations[p.goal]))
+    for r in robots:
+        problem.add_goal(domain.robot_at(_robots[r.id],_locations[r.goal_location]))
+    if backWithCharge and 'charge' in domain.parts:
+        for r in robots:
+            problem.add_goal(GE(domain.charge(_robots[r.id]),Real(Fraction(r.return_charge))))
+    if backWithCharge and levels is not None:
+        for r in robots:
+            problem.add_goal(domain.has_reserve(_robots[r.id]))
+
+    return problem, {'_locations' : _locations, '_robots' : _robots, '_packages' : _packages, '_drones' : _drones, \
+                     '_roads' : _roads, '_levels' : _levels, '_paths' : _paths}
+
+def charge_exceeded(actions : list[tuple], env : enviorment, robots, f_dist2charge) -> bool:
+    #a plan of a domain without charge that drives some robot below zero
+    roads = {}
+    for (i, j), length in zip(env.connectivityList, env.edge_lengths):
+        roads[(i, j)] = roads[(j, i)] = float(length)
+    used = {}
+    for a in actions:
+        if a[0] == 'move':
+            used[a[1]] = used.get(a[1], 0.0) + f_dist2charge(roads[(int(a[2][1:]), int(a[3][1:]))])
+    return any(used.get(f"r{bot.id}", 0.0) > bot.charge for bot in robots)
@@ -0,0 +1,174 @@
+'''
+shrinks the road graph before planning:
+    pruning     - only locations on a shortest road between two terminals are kept. terminals are where robots
+                  and drones start, robot goals, package locations and goals, and docks
+    contraction - chains of locations with two roads that are not terminals become one road, as long as the chain
+
+the planner plans on reduced_map.env with reduced_map.robots, drones and packages, and reduced_map.expand() turns
+its plan back into moves between the original locations. robots can't stop inside a contracted chain, everything
+else about the plan is as on the full map.
+'''
+import copy
+import dataclasses
+
+import numpy as np
+
+from maildelivery.world import enviorment, location
+
+SHORTEST_PATH_TOLERANCE = 1e-9 #[m]
+
+class reduced_enviorment(enviorment):
+    #an enviorment whose roads may be longer than the straight line between their ends
+    def __init__(self, locations, connectivityList, packages, lengths : list[float]):
+        super().__init__(locations, connectivityList, packages)
+        self._road_lengths = np.array(lengths, dtype = float)
+
+    @property
+    def edge_lengths(self) -> np.ndarray:
+        return self._road_lengths
+
+class reduced_map:
+    def __init__(self, env : enviorment, kept : list[int], roads : list[tuple[int,int]], \
+                    paths : dict[tuple[int,int], list[int]], lengths : list[float], robots, drones):
+        self.original = env
+        self.kept = kept #original location id of every reduced location
+        self.new_id = {id : i for i, id in enumerate(kept)}
+        self.paths = paths #(reduced from, reduced to) -> original location ids along the road, ends included
+        locations = [location(i, env.locations[id].xy, env.locations[id].type) for i, id in enumerate(kept)]
+        self.env = reduced_enviorment(locations, roads, [self.package(p) for p in (env.packages or [])], lengths)
+        self.robots = [self.agent(r, ['last_location', 'goal_location']) for r in robots]
+        self.drones = [self.agent(d, ['last_location']) for d in drones]
+
+    def package(self, p):
+        owner = self.new_id[p.owner] if p.owner_type == 'location' else p.owner
+        return dataclasses.replace(p, owner = owner, goal = self.new_id[p.goal], graphics = None)
+
+    def agent(self, a, fields : list[str]):
+        a = copy.copy(a)
+        for f in fields:
+            setattr(a, f, self.new_id[getattr(a, f)])
+        return a
+
+    def location_name(self, name : str) -> str:
+        #original pddl name of a reduced location name, other objects are left as they are
+        if name.startswith('l') and name[1:].isdigit():
+            return f"l{self.kept[int(name[1:])]}"
+        return name
+
+    def expand(self, execution_times, actions, durations) -> tuple[list, list, list]:
+        '''
+        the plan on the original map: moves along contracted roads become a move per original road,
+        splitting the move's time by road length. sorted by execution time
+        '''
+        plan = []
+        distances = self.original.distances
+        for e, a, d in zip(execution_times, actions, durations):
+            if a[0] == 'move':
+                path = self.paths[(int(a[2][1:]), int(a[3][1:]))]
+                lengths = [float(distances[u, v]) for u, v in zip(path[:-1], path[1:])]
+                total = sum(lengths)
+                t = e
+                for u, v, length in zip(path[:-1], path[1:], lengths):
+                    dt = d * length / total if total > 0 else d / len(lengths)
+                    plan.append((t, ('move', a[1], f"l{u}", f"l{v}"), dt))
+                    t += dt
+            else:
+                plan.append((e, tuple(self.location_name(x) for x in a), d))
+        plan.sort(key = lambda x: x[0])
+        return [p[0] for p in plan], [p[1] for p in plan], [p[2] for p in plan]
+
+def shortest_distances(n : int, roads, lengths) -> np.ndarray:
+    #[n,n] road distances, floyd warshall
+    D = np.full((n,n), np.inf)
+    np.fill_diagonal(D, 0.0)
+    for (i, j), length in zip(roads, lengths):
+        D[i,j] = D[j,i] = min(D[i,j], length)
+    for k in range(n):
+        D = np.minimum(D, D[:,k,None] + D[None,k,:])
+    return D
+
+def terminals(env : enviorment, robots, drones) -> set[int]:
+    t = {loc.id for loc in env.locations if loc.type == 'dock'}
+    t |= {r.last_location for r in robots} | {r.goal_location for r in robots}
+    t |= {d.last_location for d in drones}
+    for p in (env.packages or []):
+        t.add(p.goal)
+        if p.owner_type == 'location':
+            t.add(p.owner)
+    return t
+
+def relevant(env : enviorment, ends : set[int]) -> np.ndarray:
+    #[L] bool, on a shortest road between two terminals
+    D = shortest_distances(len(env.locations), env.connectivityList, env.edge_lengths)
+    ends = np.array(sorted(ends), dtype = int)
+    DT = D[ends] #[T,L]
+    through = DT[:,None,:] + DT[None,:,:] #[T,T,L] terminal to terminal through every location
+    direct = D[np.ix_(ends, ends)][:,:,None]
+    on_path = np.isfinite(direct) & (through <= direct + SHORTEST_PATH_TOLERANCE)
+    return on_path.any(axis = (0,1))
+
+def chains(adjacent : dict[int, set[int]], anchors : set[int]) -> list[list[int]] | int:
+    '''
+    roads between anchors through locations that are not. returns a location to make an anchor instead when
+    two chains join the same anchors or a chain comes back to where it started
+    '''
+    found = {} #(from, to) -> path
+    for a in sorted(anchors):
+        for n in sorted(adjacent[a]):
+            path = [a, n]
+            while path[-1] not in anchors:
+                path.append(next(m for m in adjacent[path[-1]] if m != path[-2]))
+            if (path[0], path[1]) > (path[-1], path[-2]):
+                continue #walked from its other end
+            key = (path[0], path[-1])
+            if path[0] == path[-1]:
+                return path[len(path) // 2]
+            if key in found:
+                longer = path if len(path) > 2 else found[key]
+                return longer[len(longer) // 2]
+            found[key] = path
+    return list(found.values())
+
+def reduce(env : enviorment, robots, drones = [], prune = True, contract = True) -> reduced_map:
+    ends = terminals(env, robots, drones)
+    keep = relevant(env, ends) if prune else np.ones(len(env.locations), dtype = bool)
+    nodes = {i for i in range(len(env.locations)) if keep[i]}
+    adjacent = {i : set() for i in nodes}
+    for i, j in env.connectivityList:
+        if i in nodes and j in nodes and i != j:
+            adjacent[i].add(j)
+            adjacent[j].add(i)
+
+    anchors = {i for i in nodes if i in ends or len(adjacent[i]) != 2} if contract else set(nodes)
+    while True:
+        #a loop of locations with two roads each and no anchor gets one
+        reached = set()
+        for a in anchors:
+            stack = [a]
+            while stack:
+                n = stack.pop()
+                for m in adjacent[n]:
+                    if m not in reached and m not in anchors:
+                        reached.add(m)
+                        stack.append(m)
+        loose = nodes - anchors - reached
+        if loose:
+            anchors.add(min(loose))
+            continue
+        found = chains(adjacent, anchors)
+        if isinstance(found, int):
+            anchors.add(found)
+            continue
+        break
+
+    kept = sorted(anchors)
+    new_id = {id : i for i, id in enumerate(kept)}
+    roads, lengths, paths = [], [], {}
+    distances = env.distances
+    for path in found:
+        a, b = new_id[path[0]], new_id[path[-1]]
+        roads.append((a, b))
+        lengths.append(sum(float(distances[u, v]) for u, v in zip(path[:-1], path[1:])))
+        paths[(a, b)] = path
+        paths[(b, a)] = list(reversed(path))
+    return reduced_map(env, kept, roads, paths, lengths, robots, drones)
@@ -0,0 +1,237 @@
+'''
+predicts how big the solvers' grounded problem of a robot_planner problem is, before calling them, and advises
+what to do with it.
+
+actions are counted per schema twice: naive, every parameter over every object of its type (move is R·L²),
+and static, only groundings whose static facts hold (move needs is_connected, so R·2E), which is what the
+solvers ground before their own reachability analysis. static facts are those no action changes: roads, docks
+and the distances create_problem() defines.
+
+    report = grounding.analyze(planner)
+    print(report)
+    if report.recommendation == 'refuse': ...
+
+robot_planner.solve(limits = grounding_limits()) refuses problems above the limits instead of hanging a solver.
+lpg rejects a problem with more initial facts than its MAX_INITIAL, so those are only advised in a smaller form.
+'''
+import math
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from maildelivery.world import enviorment
+from maildelivery.brains.compiled_domain import compiled_domain
+from maildelivery.brains.domain_generator import flights
+from maildelivery.brains import graph_reduction, macro_moves
+
+FACT_OVERHEAD = 6 #bytes of a fact besides its names: parentheses, spaces, '= ' and a number
+
+@dataclass
+class grounding_limits:
+    #[grounded actions] up to which an engine is advised, and above which a problem is refused
+    optic_actions : float = 5e3
+    lpg_actions : float = 5e4
+    refuse_actions : float = 1e6
+    refuse_pddl_bytes : float = 5e7
+    init_facts : float = 1e4 #lpg's MAX_INITIAL, it rejects problems with more initial facts
+
+@dataclass
+class grounding_report:
+    actions : dict[str, tuple[float, float]] = field(default_factory = dict) #schema -> (naive, static) groundings
+    fluents : dict[str, float] = field(default_factory = dict) #fluent -> groundings
+    init_facts : float = 0
+    pddl_bytes : float = 0 #of the problem file
+    recommendation : str = None #'optic', 'lpg', 'reduce_map', 'allocation', 'region_planner' or 'refuse'
+    reason : str = ''
+
+    @property
+    def ground_actions(self) -> float:
+        return sum(static for _, static in self.actions.values())
+
+    def __repr__(self):
+        lines = [f"{name}: {naive:.0f} naive, {static:.0f} static" for name, (naive, static) in self.actions.items()]
+        lines.append(f"{self.ground_actions:.0f} ground actions, {sum(self.fluents.values()):.0f} fluents, "
+                     f"{self.init_facts:.0f} initial facts, ~{self.pddl_bytes / 1e3:.0f} kB problem")
+        lines.append(f"recommendation: {self.recommendation}, {self.reason}")
+        return '\n'.join(lines)
+
+def static_facts(domain : compiled_domain, env : enviorment, robots, drones) -> dict[str, np.ndarray | list]:
+    '''
+    fluent -> bool mask over its parameters of where a static fact holds, for the location, road and level fluents.
+    a mask too big to hold is a list of (mask, parameter of every axis) factors, -1 an axis summed over
+    '''
+    L = len(env.locations)
+    c = np.array(env.connectivityList, dtype = int).reshape(-1,2)
+    connected = np.zeros((L,L), dtype = bool)
+    connected[c[:,0], c[:,1]] = connected[c[:,1], c[:,0]] = True
+    facts = {'is_connected' : connected,
+             'location_is_dock' : np.array([loc.type == 'dock' for loc in env.locations], dtype = bool)}
+    distance = connected.copy()
+    if 'drone_at' in domain.parts:
+        facts['can_fly'], facts['can_airlift'] = flights(env, robots, drones)
+        distance |= facts['can_fly'] | facts['can_airlift']
+    facts['distance'] = distance
+    if 'road' in domain.types:
+        #e{2k} drives connectivityList[k] as it is written, e{2k+1} the other way
+        ends = np.stack([c, c[:,::-1]], axis = 1).reshape(-1,2)
+        roads = np.arange(len(ends))
+        facts['road_from'] = np.zeros((len(ends), L), dtype = bool)
+        facts['road_from'][roads, ends[:,0]] = True
+        facts['road_to'] = np.zeros((len(ends), L), dtype = bool)
+        facts['road_to'][roads, ends[:,1]] = True
+        facts['road_opposite'] = np.zeros((len(ends), len(ends)), dtype = bool)
+        facts['road_opposite'][roads, roads ^ 1] = True
+        facts['road_length'] = np.ones(len(ends), dtype = bool)
+    if 'levels' in domain.parts:
+        levels = domain.levels
+        C = levels.levels + 1
+        drains = np.zeros((2 * len(c), C, C), dtype = bool) #of every road, each way
+        for k, length in enumerate(env.edge_lengths):
+            for c_from, c_to in levels.drains(length):
+                drains[2*k, c_from, c_to] = drains[2*k+1, c_from, c_to] = True
+        facts['road_drain'] = drains
+        ends = np.stack([c, c[:,::-1]], axis = 1).reshape(-1,2)
+        starts, stops = np.zeros((len(ends), L), dtype = bool), np.zeros((len(ends), L), dtype = bool)
+        starts[np.arange(len(ends)), ends[:,0]] = stops[np.arange(len(ends)), ends[:,1]] = True
+        facts['level_drain'] = [(starts, (-1, 0)), (stops, (-1, 1)), (drains, (-1, 2, 3))] #[L,L,C,C] by road
+        facts['level_full'] = np.arange(C) == C - 1
+        facts['charge_time'] = np.ones(C, dtype = bool)
+        reserved = np.array([levels.reserved(bot, True) for bot in robots], dtype = int).reshape(-1,1)
+        facts['level_reserved'] = np.arange(C) >= reserved #taking every robot back with charge
+        facts['level_short'] = ~facts['level_reserved']
+    if 'path' in domain.types:
+        macros = macro_moves.paths_of(env, robots, drones)
+        ends = np.array([[path[0], path[-1]] for path in macros.paths], dtype = int).reshape(-1,2)
+        facts['path_from'] = np.zeros((len(macros), L), dtype = bool)
+        facts['path_from'][np.arange(len(macros)), ends[:,0]] = True
+        facts['path_to'] = np.zeros((len(macros), L), dtype = bool)
+        facts['path_to'][np.arange(len(macros)), ends[:,1]] = True
+        for i in range(1, macro_moves.MAX_PASSED + 2):
+            facts[f'path_step{i}'] = np.zeros((len(macros), L), dtype = bool)
+            for k, path in enumerate(macros.paths):
+                if i < len(path):
+                    facts[f'path_step{i}'][k, path[i]] = True
+        facts['path_length'] = np.ones(len(macros), dtype = bool)
+        if 'levels' in domain.parts:
+            C = domain.levels.levels + 1
+            facts['path_drain'] = np.zeros((len(macros), C, C), dtype = bool)
+            for k, length in enumerate(macros.lengths):
+                for c_from, c_to in domain.levels.drains(length):
+                    facts['path_drain'][k, c_from, c_to] = True
+    return facts
+
+def factors(fact : np.ndarray | list) -> list[tuple[np.ndarray, tuple]]:
+    return fact if isinstance(fact, list) else [(fact, tuple(range(fact.ndim)))]
+
+def fact_count(fact : np.ndarray | list) -> float:
+    #facts of a static_facts() mask
+    parts = factors(fact)
+    letters = lambda axes: ''.join('z' if a < 0 else chr(ord('a') + a) for a in axes)
+    return float(np.einsum(','.join(letters(axes) for _, axes in parts) + '->', \
+                            *[m.astype(float) for m, _ in parts], optimize = True))
+
+def fluent_uses(node) -> list:
+    #every fluent expression in an expression
+    if node.is_fluent_exp():
+        return [node]
+    return [f for arg in node.args for f in fluent_uses(arg)]
+
+def count_actions(domain : compiled_domain, sizes : dict[str, int], facts : dict[str, np.ndarray]) -> dict[str, tuple[float, float]]:
+    '''
+    (naive, static) groundings of every action schema. sizes are objects per type, a static fluent in facts
+    restricts its parameters wherever the action conditions on it or reads it
+    '''
+    static = domain.static_fluents & set(facts)
+    counts = {}
+    for a in domain._problem.actions:
+        letters = {p.name : chr(ord('a') + i) for i, p in enumerate(a.parameters)}
+        naive = math.prod([float(sizes.get(p.type.name, 0)) for p in a.parameters])
+        conditions = [c for cs in a.conditions.values() for c in cs] if hasattr(a, 'conditions') else a.preconditions
+        expressions = list(conditions) + ([a.duration.lower] if hasattr(a, 'duration') else [])
+        operands, subscripts, seen = [], [], set()
+        for f in [f for e in expressions for f in fluent_uses(e)]:
+            name = f.fluent().name
+            params = [arg.parameter().name for arg in f.args if arg.is_parameter_exp()]
+            if name in static and len(params) == len(f.args) and (name, tuple(params)) not in seen:
+                seen.add((name, tuple(params)))
+                hidden = chr(ord('A') + len(seen)) #summed over, one for each fact
+                for mask, axes in factors(facts[name]):
+                    operands.append(mask.astype(float))
+                    subscripts.append(''.join(hidden if a < 0 else letters[params[a]] for a in axes))
+        for p in a.parameters:
+            operands.append(np.ones(sizes.get(p.type.name, 0)))
+            subscripts.append(letters[p.name])
+        counts[a.name] = (naive, float(np.einsum(','.join(subscripts) + '->', *operands, optimize = True)))
+    return counts
+
+def problem_size(domain : compiled_domain, sizes : dict[str, int], facts : dict[str, np.ndarray]) -> tuple[dict, float, float]:
+    '''
+    groundings of every fluent, and the initial facts and bytes of the problem. static facts are counted, true by
+    default facts are all there, anything else is taken to be one fact for every object it is about besides locations
+    '''
+    fluents, init, size = {}, 0.0, 0.0
+    name_length = {t : 1 + len(str(max(n - 1, 0))) for t, n in sizes.items()}
+    for name, types, default in domain.fluents:
+        fluents[name] = math.prod([float(sizes.get(t, 0)) for t in types])
+        if name in facts:
+            n = fact_count(facts[name])
+        elif default is True:
+            n = fluents[name]
+        else:
+            n = math.prod([float(sizes.get(t, 0)) for t in types if t != 'location'])
+        init += n
+        size += n * (len(name) + FACT_OVERHEAD + sum(name_length.get(t, 0) + 1 for t in types))
+    return fluents, init, size
+
+def sizes_of(domain : compiled_domain, env : enviorment, robots, drones) -> dict[str, int]:
+    return {'location' : len(env.locations), 'robot' : len(robots), 'package' : len(env.packages or []), 'drone' : len(drones),
+            'road' : 2 * len(env.connectivityList), 'level' : domain.levels.levels + 1 if 'levels' in domain.parts else 0,
+            'path' : len(macro_moves.paths_of(env, robots, drones)) if 'path' in domain.types else 0}
+
+def analyze(planner, limits : grounding_limits = None) -> grounding_report:
+    #the report of planner's last create_problem()
+    limits = limits or grounding_limits()
+    args = planner.problem_args
+    env, robots, drones = args['env'], args['robots'], args.get('drones', [])
+    domain = planner.domain
+    if 'drone' not in domain.types:
+        drones = []
+
+    report = grounding_report()
+    sizes = sizes_of(domain, env, robots, drones)
+    facts = static_facts(domain, env, robots, drones)
+    report.actions = count_actions(domain, sizes, facts)
+    report.fluents, report.init_facts, report.pddl_bytes = problem_size(domain, sizes, facts)
+    total = report.ground_actions
+    facts_fit = report.init_facts <= limits.init_facts
+
+    if total > limits.refuse_actions or report.pddl_bytes > limits.refuse_pddl_bytes:
+        report.recommendation, report.reason = 'refuse', f'{total:.0f} ground actions, ~{report.pddl_bytes / 1e6:.1f} MB problem'
+    elif facts_fit and total <= limits.optic_actions:
+        report.recommendation, report.reason = 'optic', f'{total:.0f} ground actions'
+    elif facts_fit and total <= limits.lpg_actions:
+        report.recommendation, report.reason = 'lpg', f'{total:.0f} ground actions'
+    else:
+        report.recommendation, report.reason = advise(domain, env, robots, drones, planner.reduction is None, limits)
+    return report
+
+def advise(domain : compiled_domain, env : enviorment, robots, drones, reducible : bool, limits : grounding_limits) -> tuple[str, str]:
+    #too big for lpg as it is, in ground actions or initial facts, what would make it small enough
+    def fits(sizes, facts):
+        total = sum(s for _, s in count_actions(domain, sizes, facts).values())
+        init = problem_size(domain, sizes, facts)[1]
+        return total <= limits.lpg_actions and init <= limits.init_facts, f'{total:.0f} ground actions, {init:.0f} initial facts'
+
+    if reducible:
+        reduced = graph_reduction.reduce(env, robots, drones)
+        ok, size = fits(sizes_of(domain, reduced.env, reduced.robots, reduced.drones), \
+                        static_facts(domain, reduced.env, reduced.robots, reduced.drones))
+        if ok:
+            return 'reduce_map', f'{size} on the reduced map'
+    if len(robots) > 1 and len(drones) == 0:
+        sizes = dict(sizes_of(domain, env, robots, drones), robot = 1, package = math.ceil(len(env.packages or []) / len(robots)))
+        ok, size = fits(sizes, static_facts(domain, env, robots, drones))
+        if ok:
+            return 'allocation', f'{size} a robot'
+        return 'region_planner', f'{size} a robot on the whole map'
+    return 'refuse', 'too big for lpg and can not be split between robots'
@@ -0,0 +1,117 @@
+'''
+macro moves: a robot drives the shortest road path between two key locations as one action, so plans are a lot
+shorter and the solvers search less deep. key locations are houses, docks and stations, and every location a
+robot, drone or package starts at or is headed to (graph_reduction.terminals). paths join key locations with no
+other key location on a shortest road between them, any trip between key locations is a chain of paths.
+
+robots only stop at the ends of paths. a robot driving a path reserves the locations it passes and its roads, with
+location_is_free and road_is_free as move does, so there is a macro_move{n} for every number n of locations passed,
+reading them from the static path_step{i}, the location a path reaches on its i-th road. paths passing more than
+MAX_PASSED locations are split where they pass MAX_PASSED. plan_parser.expand_macros turns macro_move actions back
+into moves.
+
+    planner.create_problem(env, robots, macro_moves = True)
+
+when to use them: on maps where key locations are far apart, with intersections between them (grids, roads that are
+long chains of intersections). don't use them where most locations are key locations: paths are a road or two, the
+search is no shorter and plans are worse, as robots can't stop to let others pass between the ends of a path.
+tests/25_macro_moves.py compares both on such maps.
+grounding.analyze(planner) gives the ground actions of both encodings to compare.
+'''
+import hashlib
+import heapq
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from maildelivery.world import enviorment
+from maildelivery.brains.graph_reduction import terminals, SHORTEST_PATH_TOLERANCE
+
+KEY_TYPES = ['house', 'dock', 'station']
+CACHED_PATHS = 16 #scenarios whose paths are kept
+MAX_PASSED = 6 #locations a path passes between its ends, the domain has a macro_move for each count up to it
+
+_paths = OrderedDict() #key locations and map -> macro_paths, least recently used first
+_paths_lock = threading.Lock() #planners of a planner_pool or region_planner share it from threads
+
+class macro_paths:
+    def __init__(self, env : enviorment, keys : list[int], paths : list[list[int]]):
+        length = {}
+        for (i, j), l in zip(env.connectivityList, env.edge_lengths):
+            length[(i, j)] = length[(j, i)] = min(float(l), length.get((i, j), np.inf))
+        self.keys = keys
+        self.paths = paths #location ids along path m{k}, ends included
+        self.road_lengths = [[length[(u, v)] for u, v in zip(path[:-1], path[1:])] for path in paths] #[m]
+        self.lengths = np.array([sum(lengths) for lengths in self.road_lengths], dtype = float) #[m]
+
+    def __len__(self):
+        return len(self.paths)
+
+def key_locations(env : enviorment, robots, drones = []) -> list[int]:
+    return sorted({loc.id for loc in env.locations if loc.type in KEY_TYPES} | terminals(env, robots, drones))
+
+def shortest_paths(env : enviorment, keys : list[int]) -> list[list[int]]:
+    '''
+    shortest road paths between key locations through no other key location, both ways, split to pass at most
+    MAX_PASSED locations. dijkstra from every key location, preferring on ties the path that passes no key location
+    '''
+    adjacent = {i : [] for i in range(len(env.locations))}
+    for (i, j), length in zip(env.connectivityList, env.edge_lengths):
+        if i != j:
+            adjacent[i].append((j, float(length)))
+            adjacent[j].append((i, float(length)))
+    is_key = np.zeros(len(env.locations), dtype = bool)
+    is_key[keys] = True
+
+    paths, seen = [], set()
+    for a in keys:
+        dist, blocked, previous = {a : 0.0}, {a : False}, {a : None}
+        heap, done = [(0.0, a)], set()
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u in done:
+                continue
+            done.add(u)
+            through = blocked[u] or (u != a and is_key[u]) #a path on from u passes a key location
+            for v, length in adjacent[u]:
+                nd = d + length
+                if v not in dist or nd < dist[v] - SHORTEST_PATH_TOLERANCE or \
+                        (nd <= dist[v] + SHORTEST_PATH_TOLERANCE and blocked[v] and not through and v not in done):
+                    dist[v], blocked[v], previous[v] = nd, through, u
+                    heapq.heappush(heap, (nd, v))
+        for b in keys:
+            if b > a and b in dist and not blocked[b]:
+                path = [b]
+                while path[-1] != a:
+                    path.append(previous[path[-1]])
+                for i in range(0, len(path) - 1, MAX_PASSED + 1):
+                    part = path[i : i + MAX_PASSED + 2]
+                    if tuple(part) not in seen:
+                        seen.update([tuple(part), tuple(part[::-1])])
+                        paths += [part[::-1], part]
+    return paths
+
+def paths_of(env : enviorment, robots, drones = []) -> macro_paths:
+    #the macro paths of a scenario, cached per map and key locations
+    keys = key_locations(env, robots, drones)
+    h = hashlib.sha256()
+    h.update(np.array([loc.xy for loc in env.locations], dtype = float).tobytes())
+    h.update(np.array(env.connectivityList, dtype = int).tobytes())
+    h.update(np.asarray(env.edge_lengths, dtype = float).tobytes())
+    h.update(np.array(keys, dtype = int).tobytes())
+    key = h.hexdigest()
+    with _paths_lock:
+        if key in _paths:
+            _paths.move_to_end(key)
+            return _paths[key]
+    paths = macro_paths(env, keys, shortest_paths(env, keys))
+    with _paths_lock:
+        _paths[key] = paths
+        if len(_paths) > CACHED_PATHS:
+            _paths.popitem(last = False)
+    return paths
+
+def clear_cache() -> None:
+    with _paths_lock:
+        _paths.clear()
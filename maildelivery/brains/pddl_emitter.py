@@ -0,0 +1,310 @@
+'''
+writes the pddl problem of the maildelivery brains straight from the enviorment and the agents, without building
+a unified_planning Problem and running PDDLWriter on it. objects, initial values, goals and metric are the ones
+PDDLWriter writes for the problem of create_problem(), numbers are formatted the same way. only the order of
+the initial values differs.
+
+fluent signatures and defaults come from the compiled domain, its features (see domain_generator) are told apart
+by the fluents it has.
+
+the facts of static location and road fluents (roads, distances, docks, flights, macro paths) are kept per fluent, keyed
+on what that fluent's facts are made of (STATIC_INPUTS): replans reuse the fluents whose inputs didn't change, so robots
+moving on the same map only rewrite the flights and macro paths that moved with them, if any. a fluent whose inputs
+changed, after editing env.locations or connectivityList, only writes again the rows (its facts about one location,
+road, level or path) whose values changed. the caches are per process, clear_cache() empties them.
+'''
+import hashlib
+import threading
+from collections import OrderedDict
+from decimal import Decimal, localcontext
+from fractions import Fraction
+from itertools import product
+
+import numpy as np
+
+from maildelivery.world import enviorment
+from maildelivery.brains.compiled_domain import compiled_domain
+from maildelivery.brains.domain_generator import flights
+from maildelivery.brains import macro_moves
+
+DECIMAL_PRECISION = 10 #as PDDLWriter
+STATIC_BLOCKS = 256 #static fluents whose facts are kept, a map has up to 17
+STATIC_ROWS = 100000 #rows of static facts kept, a row is a fluent's facts about one location, road, level or path
+MAP_TYPES = {'location' : 'l', 'road' : 'e', 'level' : 'c', 'path' : 'm'} #types of the map's objects and the prefix of their names
+
+#what the facts of each static fluent are made of, see static_inputs. fluents not named here depend on all of it
+STATIC_INPUTS = {'is_connected' : ('roads',), 'road_from' : ('roads',), 'road_to' : ('roads',), 'road_opposite' : ('roads',),
+                 'road_length' : ('roads',), 'road_drain' : ('roads', 'levels'), 'level_drain' : ('roads', 'levels'),
+                 'distance' : ('roads', 'flights'), 'can_fly' : ('flights',), 'can_airlift' : ('flights',),
+                 'location_is_dock' : ('docks',), 'level_full' : ('levels',), 'charge_time' : ('levels',),
+                 'path_from' : ('paths',), 'path_to' : ('paths',), 'path_length' : ('paths',),
+                 'path_drain' : ('paths', 'levels')} | {f'path_step{i}' : ('paths',) for i in range(1, macro_moves.MAX_PASSED + 2)}
+
+_blocks = OrderedDict() #(fluent, default, omitted value, object counts, inputs) -> facts, least recently used first
+_rows = OrderedDict() #(fluent, default, omitted value, objects per type if written for all, first object, explicit values) -> facts
+_lock = threading.Lock() #of both caches, planners share them from threads
+
+def number(x) -> str:
+    #PDDLWriter's text of a real constant
+    if isinstance(x, bool):
+        raise TypeError('not a number')
+    f = Fraction(x)
+    with localcontext() as ctx:
+        ctx.prec = DECIMAL_PRECISION
+        return str(f.numerator / Decimal(f.denominator, ctx))
+
+def emit_problem(domain : compiled_domain, env : enviorment, robots, drones = [], backWithCharge = False, \
+                    minimize_makespan = True, omit : dict[str, float] = {}) -> str:
+    '''
+    the problem text of create_problem(env, robots, drones, backWithCharge) on domain.
+    omit maps numeric fluents to a default value whose facts are left out, see manipulate_pddls.remove_init_values
+    '''
+    fluents = {name : (types, default) for name, types, default in domain.fluents}
+    Nrobots = len(robots)
+    objects = {'location' : [f"l{loc.id}" for loc in env.locations],
+               'robot' : [f"r{r.id}" for r in robots],
+               'package' : [f"p{p.id}" for p in env.packages],
+               'drone' : [f"d{d.id - Nrobots}" for d in drones] if 'drone' in domain.types else [],
+               'road' : [f"e{k}" for k in range(2 * len(env.connectivityList))] if 'road' in domain.types else [],
+               'level' : [f"c{c}" for c in range(domain.levels.levels + 1)] if 'level' in domain.types else [],
+               'path' : [f"m{k}" for k in range(len(macro_moves.paths_of(env, robots, drones)))] \
+                        if 'path' in domain.types else []}
+    l, r, p, d = objects['location'], objects['robot'], objects['package'], objects['drone']
+
+    #explicitly set initial values, by fluent: {args : value}
+    values = {name : {} for name in fluents}
+
+    #robots at start
+    for bot in robots:
+        values['robot_at'][(r[bot.id], l[bot.last_location])] = True
+        values['location_is_free'][(l[bot.last_location],)] = False
+        values['robot_velocity'][(r[bot.id],)] = robots[bot.id].velocity
+        if 'charge' in fluents:
+            values['charge'][(r[bot.id],)] = robots[bot.id].charge
+        if 'charge_level' in fluents:
+            values['charge_level'][(r[bot.id], f"c{domain.levels.level(bot.charge)}")] = True
+            #the levels with the robot's reserve, see charge_levels
+            reserved = domain.levels.reserved(bot, backWithCharge)
+            if domain.levels.level(bot.charge) >= reserved:
+                values['has_reserve'][(r[bot.id],)] = True
+            for c in range(domain.levels.levels + 1):
+                values['level_reserved' if c >= reserved else 'level_short'][(r[bot.id], f"c{c}")] = True
+    for dr in (drones if 'drone_at' in fluents else []):
+        values['drone_at'][(d[dr.id - Nrobots], l[dr.last_location])] = True
+        values['drone_velocity'][(d[dr.id - Nrobots],)] = drones[dr.id - Nrobots].velocity
+
+    #place packages
+    for pkg in env.packages:
+        if pkg.owner_type == 'location':
+            values['location_has_package'][(p[pkg.id], l[pkg.owner])] = True
+        elif pkg.owner_type == 'robot':
+            values['robot_has_package'][(p[pkg.id], r[pkg.owner])] = True
+            values['robot_not_holding_package'][(r[pkg.owner],)] = False
+
+    static = static_fluents(domain)
+    init = []
+    for name, (types, default) in fluents.items():
+        if name in static:
+            continue
+        explicit = values[name]
+        if default is False:
+            init += [f"({name} {' '.join(args)})" for args, v in explicit.items() if v is True]
+        elif default is True:
+            #the facts of every grounding, but the ones set false
+            everything = [f"({name} {' '.join(args)})" for args in product(*[objects[t] for t in types])]
+            index = [{o : k for k, o in enumerate(objects[t])} for t in types]
+            false = sorted(np.ravel_multi_index(tuple(index[k][a] for k, a in enumerate(args)), \
+                            [len(objects[t]) for t in types]) for args, v in explicit.items() if v is not True)
+            kept = 0
+            for k in false:
+                init += everything[kept:k]
+                kept = k + 1
+            init += everything[kept:]
+        else:
+            #numeric. without a default only explicit values exist
+            skip = omit.get(name)
+            groundings = explicit.keys() if default is None else product(*[objects[t] for t in types])
+            for args in groundings:
+                v = explicit.get(args, default)
+                if skip is None or float(v) != skip:
+                    init.append(f"(= ({name} {' '.join(args)}) {number(v)})")
+    #roads, distances and docks, the same for every problem on the map
+    init += static_block(domain, env, robots, drones, omit)
+
+    goals = [f"(location_has_package {p[pkg.id]} {l[pkg.goal]})" for pkg in env.packages]
+    goals += [f"(robot_at {r[bot.id]} {l[bot.goal_location]})" for bot in robots]
+    if backWithCharge and 'charge' in fluents:
+        goals += [f"(<= {number(bot.return_charge)} (charge {r[bot.id]}))" for bot in robots]
+    if backWithCharge and 'charge_level' in fluents:
+        goals += [f"(has_reserve {r[bot.id]})" for bot in robots]
+
+    name = domain.name.lower()
+    out = [f"(define (problem {name}-problem)\n", f" (:domain {name}-domain)\n", " (:objects"]
+    for t in domain.types:
+        if len(objects.get(t, [])) > 0:
+            out.append(f"\n   {' '.join(objects[t])} - {t}")
+    out.append("\n )\n")
+    out.append(f" (:init{''.join([' ' + fact for fact in init])})\n")
+    out.append(f" (:goal (and {' '.join(goals)}))\n")
+    if minimize_makespan:
+        out.append(" (:metric minimize (total-time))\n")
+    out.append(")\n")
+    return ''.join(out)
+
+def static_fluents(domain : compiled_domain) -> list[str]:
+    #fluents no action changes about locations and roads only, in declaration order. the same on every problem on a map
+    static = domain.static_fluents
+    return [name for name, types, _ in domain.fluents if name in static and all(t in MAP_TYPES for t in types)]
+
+def static_inputs(domain : compiled_domain, env : enviorment, robots, drones = []) -> dict[str, str]:
+    #hash of what each static fluent's facts are made of. flights and macro paths are keyed on the flights and paths
+    #themselves, not on where the agents are, so agents moving without changing them keep their facts
+    def digest(*parts) -> str:
+        h = hashlib.sha256()
+        for part in parts:
+            h.update(part if isinstance(part, bytes) else repr(part).encode())
+        return h.hexdigest()
+
+    inputs = {'roads' : digest(np.array(env.connectivityList, dtype = int).tobytes(), \
+                                np.asarray(env.edge_lengths, dtype = float).tobytes()),
+              'docks' : digest([loc.type == 'dock' for loc in env.locations]),
+              'levels' : digest(domain.levels.key if 'levels' in domain.parts else None),
+              'flights' : None, 'paths' : None}
+    if 'drone_at' in domain.parts:
+        can_fly, can_airlift = flights(env, robots, drones)
+        flown = can_fly | can_airlift
+        inputs['flights'] = digest(np.packbits(can_fly).tobytes(), np.packbits(can_airlift).tobytes(), \
+                                   env.distances[flown].tobytes())
+    if 'path' in domain.types:
+        macros = macro_moves.paths_of(env, robots, drones)
+        inputs['paths'] = digest(macros.paths, np.asarray(macros.lengths, dtype = float).tobytes())
+    every = tuple(inputs)
+    return {name : digest([inputs[i] for i in STATIC_INPUTS.get(name, every)]) for name in static_fluents(domain)}
+
+def static_values(domain : compiled_domain, env : enviorment, robots, drones = [], names : list[str] = None) \
+        -> dict[str, dict[int, dict[tuple, object]]]:
+    #explicitly set initial values of the static fluents (of names only, if given), by fluent and first argument:
+    #{other arguments : value}. arguments are location ids, road numbers, levels and path numbers
+    values = {name : {} for name in static_fluents(domain) if names is None or name in names}
+    def set_value(name, args, value):
+        if name in values:
+            values[name].setdefault(args[0], {})[args[1:]] = value
+    def needs(source):
+        return any(source in STATIC_INPUTS.get(name, [source]) for name in values)
+
+    #flights drones can make, roads come after so robots drive their length
+    if 'drone_at' in domain.parts and needs('flights'):
+        can_fly, can_airlift = flights(env, robots, drones)
+        distances = env.distances
+        for i, j in zip(*np.nonzero(can_fly | can_airlift)):
+            set_value('distance', (int(i), int(j)), float(distances[i, j]))
+        for i, j in zip(*np.nonzero(can_fly)):
+            set_value('can_fly', (int(i), int(j)), True)
+        for i, j in zip(*np.nonzero(can_airlift)):
+            set_value('can_airlift', (int(i), int(j)), True)
+
+    #locations connectivity and distance. road e{2k} drives connectivityList[k] as it is written, e{2k+1} the other way
+    if needs('roads'):
+        for k, ((i, j), length) in enumerate(zip(env.connectivityList, env.edge_lengths)):
+            for args in [(i, j), (j, i)]:
+                set_value('is_connected', args, True)
+                set_value('distance', args, float(length))
+            for rd, back, (a, b) in [(2*k, 2*k+1, (i, j)), (2*k+1, 2*k, (j, i))]:
+                set_value('road_from', (rd, a), True)
+                set_value('road_to', (rd, b), True)
+                set_value('road_opposite', (rd, back), True)
+                set_value('road_length', (rd,), float(length))
+            if 'levels' in domain.parts:
+                for rd, (a, b) in [(2*k, (i, j)), (2*k+1, (j, i))]:
+                    for c_from, c_to in domain.levels.drains(length):
+                        set_value('road_drain', (rd, c_from, c_to), True)
+                        set_value('level_drain', (a, b, c_from, c_to), True)
+
+    if 'path' in domain.types and needs('paths'):
+        macros = macro_moves.paths_of(env, robots, drones)
+        for k, (path, length) in enumerate(zip(macros.paths, macros.lengths)):
+            set_value('path_from', (k, path[0]), True)
+            set_value('path_to', (k, path[-1]), True)
+            set_value('path_length', (k,), float(length))
+            for i, l in enumerate(path[1:], 1):
+                set_value(f'path_step{i}', (k, l), True)
+            if 'levels' in domain.parts:
+                for c_from, c_to in domain.levels.drains(length):
+                    set_value('path_drain', (k, c_from, c_to), True)
+
+    if 'levels' in domain.parts:
+        set_value('level_full', (domain.levels.levels,), True)
+        for c in range(domain.levels.levels + 1):
+            set_value('charge_time', (c,), domain.levels.charge_time(c))
+    for loc in env.locations:
+        if loc.type == 'dock':
+            set_value('location_is_dock', (loc.id,), True)
+    return values
+
+def static_row(name : str, types : list[str], default, skip, sizes : dict[str, int], i : int, \
+                explicit : dict[tuple, object]) -> list[str]:
+    #a static fluent's facts about object i of its first type, sizes objects of each type. formatted as in emit_problem()
+    everywhere = default is True or (default is not None and default is not False and (skip is None or float(default) != skip))
+    #only rows written for every grounding depend on the number of objects, the others on their explicit facts alone
+    sizes_key = tuple(sizes[t] for t in types[1:]) if everywhere else None
+    key = (name, default, skip, sizes_key, i, tuple(sorted(explicit.items())))
+    with _lock:
+        if key in _rows:
+            _rows.move_to_end(key)
+            return _rows[key]
+    head = f"{name} {MAP_TYPES[types[0]]}{i}"
+    rest = types[1:]
+    fact = lambda args: ' '.join([head] + [f"{MAP_TYPES[t]}{j}" for t, j in zip(rest, args)])
+    if default is False:
+        facts = [f"({fact(args)})" for args, v in sorted(explicit.items()) if v is True]
+    elif default is True:
+        facts = [f"({fact(args)})" for args in product(*[range(sizes[t]) for t in rest]) if explicit.get(args, True) is True]
+    else:
+        #numeric. defaults that are left out need no product over the objects
+        groundings = product(*[range(sizes[t]) for t in rest]) if everywhere else sorted(explicit)
+        facts = []
+        for args in groundings:
+            v = explicit.get(args, default)
+            if skip is None or float(v) != skip:
+                facts.append(f"(= ({fact(args)}) {number(v)})")
+    with _lock:
+        _rows[key] = facts
+        if len(_rows) > STATIC_ROWS:
+            _rows.popitem(last = False)
+    return facts
+
+def static_block(domain : compiled_domain, env : enviorment, robots, drones = [], omit : dict[str, float] = {}) -> list[str]:
+    #initial facts of the static location and road fluents, cached by fluent on its inputs and by row
+    fluents = {name : (types, default) for name, types, default in domain.fluents}
+    sizes = {'location' : len(env.locations), 'road' : 2 * len(env.connectivityList), \
+             'level' : domain.levels.levels + 1 if 'levels' in domain.parts else 0, \
+             'path' : len(macro_moves.paths_of(env, robots, drones)) if 'path' in domain.types else 0}
+    keys = {}
+    blocks = {}
+    for name, inputs in static_inputs(domain, env, robots, drones).items():
+        types, default = fluents[name]
+        keys[name] = (name, tuple(types), default, omit.get(name), tuple(sizes[t] for t in types), inputs)
+        with _lock:
+            if keys[name] in _blocks:
+                _blocks.move_to_end(keys[name])
+                blocks[name] = _blocks[keys[name]]
+
+    missing = [name for name in keys if name not in blocks]
+    values = static_values(domain, env, robots, drones, missing) if len(missing) > 0 else {}
+    for name in missing:
+        types, default = fluents[name]
+        rows = values[name]
+        every_row = default is True or (default is not None and default is not False and \
+                                         (omit.get(name) is None or float(default) != omit[name]))
+        blocks[name] = [fact for i in (range(sizes[types[0]]) if every_row else sorted(rows)) \
+                        for fact in static_row(name, types, default, omit.get(name), sizes, i, rows.get(i, {}))]
+        with _lock:
+            _blocks[keys[name]] = blocks[name]
+            if len(_blocks) > STATIC_BLOCKS:
+                _blocks.popitem(last = False)
+    return [fact for name in keys for fact in blocks[name]]
+
+def clear_cache() -> None:
+    with _lock:
+        _blocks.clear()
+        _rows.clear()
@@ -1,5 +1,6 @@
 from maildelivery.agents import agent, robot, action, robot_fly, wait, move, pickup, drop, chargeup, drone_fly, drone_fly_robot
 from maildelivery.world import enviorment
+from maildelivery.brains.macro_moves import macro_paths
 
 def parse_plan(execution_times, actions, durations, env : enviorment, agents : list[agent]):
     #from actions ('action_name','param1','param2') to my actions
@@ -12,6 +13,7 @@ def parse_plan(execution_times, actions, durations, env : enviorment, agents : l
         name = a[0]
         params = a[1:]
         if name == 'move':
+            #the encodings' moves with more parameters read as move(r, l_from, l_to), see plain_plan
             parsed_actions.append(move(
             agent = agents[(int(params[0][1:]))],
             loc_from = env.locations[int(params[1][1:])], #locations_from
@@ -69,6 +71,40 @@ def parse_plan(execution_times, actions, durations, env : enviorment, agents : l
 
     return parsed_actions
 
+def location_moves(actions : list[tuple]) -> list[tuple]:
+    #moves of the roads encoding ('move', r, l_from, l_to, rd, back) as ('move', r, l_from, l_to)
+    return [a[:4] if a[0] == 'move' else a for a in actions]
+
+def plain_plan(execution_times, actions, durations):
+    '''
+    a plan of the roads or charge_levels encodings (see domain_generator) in the actions of the default one:
+    moves as ('move', r, l_from, l_to) and chargeups as ('chargeup', r, l), move_below read as move
+    '''
+    actions = [(a[0][:-len('_below')],) + a[1:] if a[0].endswith('_below') else a for a in actions]
+    actions = [a[:3] if a[0] == 'chargeup' else a for a in location_moves(actions)]
+    return list(execution_times), actions, list(durations)
+
+def expand_macros(execution_times, actions, durations, macros : macro_paths):
+    '''
+    macro_move{n}(r, l_from, l_to, m{k}, ...) actions of the macros encoding (see macro_moves) as a move per road of
+    path k, splitting the macro's time by road length. sorted by execution time
+    '''
+    plan = []
+    for e, a, d in zip(execution_times, actions, durations):
+        if a[0].startswith('macro_move'):
+            k = int(a[4][1:])
+            path, lengths = macros.paths[k], macros.road_lengths[k]
+            total = sum(lengths)
+            t = e
+            for u, v, length in zip(path[:-1], path[1:], lengths):
+                dt = d * length / total if total > 0 else d / len(lengths)
+                plan.append((t, ('move', a[1], f"l{u}", f"l{v}"), dt))
+                t += dt
+        else:
+            plan.append((e, a, d))
+    plan.sort(key = lambda x: x[0])
+    return [p[0] for p in plan], [p[1] for p in plan], [p[2] for p in plan]
+
 def actions_indicies_per_agent(parsed_actions : list[action], Nagents):
     #split to N lists each holding indicies of actions [indicies for robot0, indicies for robot1...]
     actions_indicies_per_agent = [[] for _ in range(Nagents)]
@@ -0,0 +1,153 @@
+'''
+long lived pool of planner processes. every worker imports unified_planning and builds the domains of its brains
+once, each feature set create_problem() can prune them to included, so a request only pays for create_problem, writing the pddls and the solver run.
+
+    pool = planner_pool()
+    future = pool.submit(env, robots, drones, engine_name = 'lpg', deadline = 10.0)
+    execution_times, actions, durations = future.result()
+'''
+import dataclasses
+import importlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, Future
+from types import SimpleNamespace
+
+from maildelivery.world import enviorment
+from maildelivery.agents import robot, drone
+from maildelivery.brains.domain_generator import pruned_features
+
+BRAINS = ('bots_simple', 'bots_charge_added', 'bots_and_drones')
+AGENT_FIELDS = ('id', 'last_location', 'goal_location', 'velocity', 'charge', 'return_charge')
+PLANNER_OPTIONS = ('f_dist2charge', 'f_charge2time', 'max_charge') #planner attributes a request can set
+WARM_UP_TIMEOUT = 300.0 #[s] a worker waits for the others to be warm, in case one of them never is
+
+_ready = None #barrier the pool's warm up tasks meet at, one task a worker
+
+def brain_module(brain : str):
+    return importlib.import_module(f'maildelivery.brains.brains_{brain}')
+
+def _warm_up(brains, ready) -> None:
+    #compiles every domain the brains can plan on into the worker's domain cache, pddl domain text included
+    global _ready
+    _ready = ready
+    for brain in brains:
+        planner = brain_module(brain).robot_planner()
+        for features in pruned_features(planner.FEATURES):
+            planner.create_domain(features)
+            planner.domain.pddl_domain
+
+def _wait_ready() -> None:
+    #blocks a warm worker until every worker is, so each of the pool's warm up tasks takes a worker of its own
+    _ready.wait(WARM_UP_TIMEOUT)
+
+def build_planner(brain : str, env : enviorment, robots, drones, backWithCharge : bool, \
+                    planner_options : dict = None, problem_options : dict = None):
+    #a planner of brain with the problem created. planner_options are set on the planner before (see PLANNER_OPTIONS),
+    #problem_options are create_problem's own (prune, reduce_map, road_objects...). the domain comes from the worker's cache
+    planner = brain_module(brain).robot_planner()
+    for option, value in (planner_options or {}).items():
+        setattr(planner, option, value)
+    problem_options = problem_options or {}
+    if brain == 'bots_simple':
+        planner.create_problem(env, robots, **problem_options)
+    elif brain == 'bots_charge_added':
+        planner.create_problem(env, robots, backWithCharge = backWithCharge, **problem_options)
+    else:
+        planner.create_problem(env, robots, drones, backWithCharge = backWithCharge, **problem_options)
+    return planner
+
+def check_options(brain : str, planner_options : dict = None) -> None:
+    #before the request crosses to a worker, which would only fail there
+    if brain not in BRAINS:
+        raise ValueError(f'unknown brain {brain}')
+    unknown = set(planner_options or {}) - set(PLANNER_OPTIONS)
+    if len(unknown) > 0:
+        raise ValueError(f'unknown planner options {sorted(unknown)}, only {PLANNER_OPTIONS} can be set')
+    if planner_options and brain == 'bots_simple':
+        raise ValueError('bots_simple plans no charge, it has no planner options')
+
+def _solve(brain : str, env : enviorment, robots, drones, backWithCharge : bool, solve_options : dict, \
+            planner_options : dict = None, problem_options : dict = None):
+    return build_planner(brain, env, robots, drones, backWithCharge, planner_options, problem_options).solve(**solve_options)
+
+def _snapshot_env(env : enviorment) -> enviorment:
+    #packages may hold matplotlib artists, which don't pickle
+    packages = None if env.packages is None else [dataclasses.replace(p, graphics = None) for p in env.packages]
+    return enviorment(env.locations, env.connectivityList, packages)
+
+def _snapshot_agent(agent : robot | drone) -> SimpleNamespace:
+    #agents hold lambdas and matplotlib artists, which don't pickle. the planner only reads these
+    return SimpleNamespace(**{f : getattr(agent, f) for f in AGENT_FIELDS if hasattr(agent, f)})
+
+class planner_pool:
+    def __init__(self, workers : int = None, brains = BRAINS):
+        '''
+        starts workers processes (default: one per cpu), each building the domains of brains.
+        returns once every worker is warm, raises (and stops the workers) if one of them is not within WARM_UP_TIMEOUT.
+        '''
+        workers = workers or os.cpu_count()
+        context = multiprocessing.get_context()
+        self.executor = ProcessPoolExecutor(max_workers = workers, mp_context = context, \
+                                            initializer = _warm_up, initargs = (tuple(brains), context.Barrier(workers)))
+        try:
+            for future in [self.executor.submit(_wait_ready) for _ in range(workers)]:
+                future.result()
+        except BaseException:
+            self.shutdown(wait = False)
+            raise
+
+    def submit(self, env : enviorment, robots : list[robot], drones : list[drone] = [], \
+                brain = 'bots_and_drones', backWithCharge = False, planner_options : dict = None, \
+                problem_options : dict = None, **solve_options) -> Future:
+        '''
+        solves the problem in a worker. planner_options set the planner's f_dist2charge, f_charge2time and max_charge,
+        problem_options are those of the brain's create_problem (prune, reduce_map, road_objects, charge_levels,
+        macro_moves), so the worker plans the problem planner.create_problem(...) would. both cross processes, so the
+        charge functions have to pickle (module level functions, not lambdas).
+        solve_options are those of robot_planner.solve, except on_incumbent which can't cross processes.
+        the future resolves to solve's (execution_times, actions, durations) or raises its solve_error
+        '''
+        if solve_options.get('on_incumbent') is not None:
+            raise ValueError('on_incumbent is not supported by the pool')
+        check_options(brain, planner_options)
+        return self.executor.submit(_solve, brain, _snapshot_env(env), [_snapshot_agent(r) for r in robots], \
+                                    [_snapshot_agent(d) for d in drones], backWithCharge, solve_options, \
+                                    planner_options, problem_options)
+
+    def shutdown(self, wait = True) -> None:
+        self.executor.shutdown(wait = wait, cancel_futures = not wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+class pool_owner:
+    '''
+    a planner solving in a planner_pool: the one it was given, or one it makes on first use with a worker for each
+    problem it solves at once (at most one per cpu), kept for its later solves until shutdown()
+    '''
+    pool : planner_pool = None
+    owns_pool : bool = False
+    brain : str = None
+
+    def worker_pool(self, workers : int) -> planner_pool:
+        if self.pool is None:
+            self.pool = planner_pool(max(1, min(workers, os.cpu_count())), brains = [self.brain])
+            self.owns_pool = True
+        return self.pool
+
+    def shutdown(self, wait = True) -> None:
+        #of the pool it made, a pool it was given is left running
+        if self.owns_pool:
+            self.pool.shutdown(wait = wait)
+            self.pool = None
+            self.owns_pool = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
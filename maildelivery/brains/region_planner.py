@@ -0,0 +1,220 @@
+'''
+plans big maps by regions. the road graph is split into regions around robot starts, every region is planned
+on its own in a planner_pool worker, and the plans are stitched into one timed plan.
+
+packages that cross regions are handed off: the region a package starts in drops it at a hand-off location on
+the border, in the next phase the neighbouring region picks it up there, and so on until its goal. regions of
+a phase are solved in parallel. robots never leave their region, they end every phase on their goal location.
+
+    planner = region_planner(regions = 4)
+    execution_times, actions, durations = planner.solve(env, robots, engine_name = 'lpg', deadline = 10.0)
+'''
+import math
+from types import SimpleNamespace
+
+import numpy as np
+
+from maildelivery.world import enviorment, location, package
+from maildelivery.binary_solvers.result import solve_result, solve_error
+from maildelivery.brains.graph_reduction import shortest_distances
+from maildelivery.brains.planner_pool import planner_pool, pool_owner, brain_module, AGENT_FIELDS
+
+def partition(env : enviorment, seeds : list[int]) -> np.ndarray:
+    #[L] region of every location: its nearest seed by road, seeds are location ids
+    D = shortest_distances(len(env.locations), env.connectivityList, env.edge_lengths)
+    return np.argmin(D[seeds], axis = 0)
+
+def spread_seeds(env : enviorment, candidates : list[int], n : int) -> list[int]:
+    #n of candidates far apart by road, farthest point first
+    D = shortest_distances(len(env.locations), env.connectivityList, env.edge_lengths)
+    candidates = sorted(set(candidates))
+    seeds = [candidates[0]]
+    while len(seeds) < min(n, len(candidates)):
+        gap = D[np.ix_(seeds, candidates)].min(axis = 0)
+        seeds.append(candidates[int(np.argmax(gap))])
+    return seeds
+
+def shortest_path(env : enviorment, D : np.ndarray, start : int, goal : int) -> list[int]:
+    path = [start]
+    distances = env.distances
+    while path[-1] != goal:
+        u = path[-1]
+        path.append(min(env.find_adjacent(env.locations[u]), key = lambda n: distances[u, n] + D[n, goal]))
+    return path
+
+def collisions(execution_times, actions, durations, robots) -> list[tuple]:
+    '''
+    (location or road, robot, robot) of every collision in a plan: two robots on a location at once, a moving
+    robot holding its destination from the start of the move, or two robots on a road in opposite directions
+    '''
+    stays, roads = {}, {}
+    at = {f"r{r.id}" : (r.last_location, 0.0) for r in robots}
+    for e, a, d in sorted(zip(execution_times, actions, durations), key = lambda x: x[0]):
+        if a[0] == 'move':
+            u, v = int(a[2][1:]), int(a[3][1:])
+            loc, since = at[a[1]]
+            stays.setdefault(loc, []).append((since, e, a[1]))
+            roads.setdefault((u, v), []).append((e, e + d, a[1]))
+            at[a[1]] = (v, e)
+    for name, (loc, since) in at.items():
+        stays.setdefault(loc, []).append((since, math.inf, name))
+
+    found = []
+    overlap = lambda x, y: x[0] < y[1] and y[0] < x[1] and x[2] != y[2]
+    for loc, spans in stays.items():
+        found += [(f"l{loc}", x[2], y[2]) for i, x in enumerate(spans) for y in spans[i+1:] if overlap(x, y)]
+    for (u, v), spans in roads.items():
+        if u < v:
+            found += [(f"l{u}-l{v}", x[2], y[2]) for x in spans for y in roads.get((v, u), []) if overlap(x, y)]
+    return found
+
+class region_problem:
+    #a region's part of a phase, renumbered so the brains can plan it, and its plan named back
+    def __init__(self, env : enviorment, nodes : set[int], robots : list, hops : list[tuple]):
+        self.locations = sorted(nodes)
+        self.robots = [r.id for r in robots]
+        self.packages = [p.id for p, _, _ in hops]
+        new = {id : i for i, id in enumerate(self.locations)}
+        holder = {id : i for i, id in enumerate(self.robots)}
+
+        locations = [location(i, env.locations[id].xy, env.locations[id].type) for i, id in enumerate(self.locations)]
+        roads = [(new[i], new[j]) for i, j in env.connectivityList if i in new and j in new]
+        packages = [package(k, holder[start[1]] if start[0] == 'robot' else new[start[1]], start[0], new[goal], \
+                            p.deliverytime, p.xy) for k, (p, start, goal) in enumerate(hops)]
+        self.env = enviorment(locations, roads, packages)
+        self.agents = [SimpleNamespace(**dict({f : getattr(r, f) for f in AGENT_FIELDS if hasattr(r, f)}, \
+                        id = k, last_location = new[r.last_location], goal_location = new[r.goal_location])) \
+                        for k, r in enumerate(robots)]
+
+    def name(self, x : str) -> str:
+        ids = {'l' : self.locations, 'r' : self.robots, 'p' : self.packages}.get(x[0])
+        return f"{x[0]}{ids[int(x[1:])]}" if ids is not None and x[1:].isdigit() else x
+
+    def restore(self, actions : list[tuple]) -> list[tuple]:
+        return [tuple([a[0]] + [self.name(x) for x in a[1:]]) for a in actions]
+
+class region_planner(pool_owner):
+    def __init__(self, brain = 'bots_charge_added', regions : int = 4, pool : planner_pool = None):
+        '''
+        regions is at most the number of robot start locations. pool defaults to one made by the first solve with a
+        worker per region, kept until shutdown(), see planner_pool.pool_owner
+        '''
+        self.brain = brain
+        self.regions = regions
+        self.pool = pool
+        constants = brain_module(brain).robot_planner()
+        self.f_dist2charge = getattr(constants, 'f_dist2charge', None)
+        self.max_charge = getattr(constants, 'max_charge', None)
+        self.region = None #[L] region of every location, of the last solve()
+        self.phases = [] #[{region : region_problem}] of the last solve()
+
+    def handoff(self, path : list[int], i : int, parking : set[int]) -> int:
+        #where a package leaves path[i]'s region for path[i+1]'s. not where robots start or end
+        for l in [path[i], path[i+1]]:
+            if l not in parking:
+                return l
+        return path[i]
+
+    def hops(self, env : enviorment, robots : list) -> dict[int, list[tuple]]:
+        #package id -> [(region, (owner_type, owner), goal location)] in the order they are carried
+        D = shortest_distances(len(env.locations), env.connectivityList, env.edge_lengths)
+        parking = {r.last_location for r in robots} | {r.goal_location for r in robots}
+        hops = {}
+        for p in (env.packages or []):
+            start = ('location', p.owner) if p.owner_type == 'location' else ('robot', p.owner)
+            origin = p.owner if p.owner_type == 'location' else robots[p.owner].last_location
+            path = shortest_path(env, D, origin, p.goal)
+            hops[p.id] = []
+            for i in range(len(path) - 1):
+                if self.region[path[i]] != self.region[path[i+1]]:
+                    l = self.handoff(path, i, parking)
+                    hops[p.id].append((self.region[path[i]], start, l))
+                    start = ('location', l)
+            if start != ('location', p.goal):
+                hops[p.id].append((self.region[path[-1]], start, p.goal))
+        return hops
+
+    def solve(self, env : enviorment, robots : list, backWithCharge = False, **solve_options):
+        '''
+        the plan of all robots on env, as robot_planner.solve returns it. solve_options are those of
+        robot_planner.solve, every region gets them. raises the solve_error of a region that could not be solved,
+        or of a region plan that collides with the others however it is delayed
+        '''
+        solve_options.pop('time_fix', None) #regions are stitched on the solvers' times
+        seeds = spread_seeds(env, [r.last_location for r in robots], self.regions)
+        self.region = partition(env, seeds)
+        for r in robots:
+            if self.region[r.goal_location] != self.region[r.last_location]:
+                raise ValueError(f'robot {r.id} has its goal in another region')
+        hops = self.hops(env, robots)
+
+        state = {r.id : SimpleNamespace(**{f : getattr(r, f) for f in AGENT_FIELDS if hasattr(r, f)}) for r in robots}
+        owner = {p.id : hops[p.id][0][1] for p in (env.packages or []) if len(hops[p.id]) > 0}
+        plan = ([], [], [])
+        self.phases = []
+        pool = self.worker_pool(len(seeds))
+        for phase in range(max([len(h) for h in hops.values()] + [1])):
+            work = {}
+            for p in (env.packages or []):
+                if phase < len(hops[p.id]):
+                    region, _, goal = hops[p.id][phase]
+                    work.setdefault(region, []).append((p, owner[p.id], goal))
+            #regions without packages only plan in phase 0, for robots not on their goal yet
+            busy = set(work) | ({int(self.region[r.last_location]) for r in robots \
+                                if r.last_location != r.goal_location} if phase == 0 else set())
+            problems = {}
+            for region in sorted(busy):
+                bots = [state[r.id] for r in robots if self.region[r.last_location] == region]
+                nodes = {i for i in range(len(env.locations)) if self.region[i] == region}
+                for p, start, goal in work.get(region, []):
+                    nodes |= {goal} if start[0] == 'robot' else {start[1], goal}
+                problems[region] = region_problem(env, nodes, bots, work.get(region, []))
+            futures = {region : pool.submit(sub.env, sub.agents, [], brain = self.brain, \
+                        backWithCharge = backWithCharge, time_fix = False, **solve_options) \
+                        for region, sub in problems.items()}
+            plans = {region : future.result() for region, future in futures.items()}
+            self.phases.append(problems)
+
+            self.stitch(plan, plans, problems, robots)
+            for region, (_, actions, _) in plans.items():
+                self.advance(state, problems[region].restore(actions), env)
+            for p, _, goal in [h for w in work.values() for h in w]:
+                owner[p.id] = ('location', goal)
+
+        found = collisions(*plan, robots)
+        if len(found) > 0:
+            raise solve_error(solve_result('region_planner', 'unsolvable', stats = {'collisions' : found}))
+        plan = sorted(zip(*plan), key = lambda x: x[0])
+        return [x[0] for x in plan], [x[1] for x in plan], [x[2] for x in plan]
+
+    def stitch(self, plan : tuple[list, list, list], plans : dict, problems : dict, robots : list) -> None:
+        #appends a phase to plan. a region plan that collides with the phase so far waits for it to end,
+        #if it still collides then, it never stops (robots stay on their last location for good)
+        start = max([e + d for e, d in zip(plan[0], plan[2])] + [0.0])
+        end = start
+        for region, (execution_times, actions, durations) in plans.items():
+            actions = problems[region].restore(actions)
+            first = min(execution_times + [0.0])
+            for offset in [start, end]:
+                candidate = ([e - first + offset for e in execution_times], actions, durations)
+                found = collisions(plan[0] + candidate[0], plan[1] + candidate[1], plan[2] + candidate[2], robots)
+                if len(found) == 0:
+                    break
+            if len(found) > 0:
+                raise solve_error(solve_result('region_planner', 'unsolvable', stats = {'region' : region, 'collisions' : found}))
+            for x, y in zip(plan, candidate):
+                x += y
+            end = max([end] + [e + d for e, d in zip(candidate[0], candidate[2])])
+
+    def advance(self, state : dict, actions : list[tuple], env : enviorment) -> None:
+        #robot locations and charge after a region plan
+        for a in actions:
+            bot = state.get(int(a[1][1:])) if a[0] in ['move', 'chargeup'] else None
+            if bot is None:
+                continue
+            if a[0] == 'move':
+                bot.last_location = int(a[3][1:])
+                if self.f_dist2charge is not None and hasattr(bot, 'charge'):
+                    bot.charge -= self.f_dist2charge(env.distance(int(a[2][1:]), int(a[3][1:])))
+            elif self.max_charge is not None:
+                bot.charge = self.max_charge
@@ -49,6 +49,53 @@ class enviorment:
         self.connectivityList : list[(int,int)]  = connectivityList
         self.packages : list[package] = packages
 
+    #geometry is computed once and cached, keyed on the locations' xy and the roads, so editing either in place
+    #(moving a location, rewiring a road) is picked up on the next read
+    @property
+    def locations(self) -> list[location]:
+        return self._locations
+
+    @locations.setter
+    def locations(self, locations : list[location]):
+        self._locations = locations
+        self.invalidate()
+
+    @property
+    def connectivityList(self) -> list[(int,int)]:
+        return self._connectivityList
+
+    @connectivityList.setter
+    def connectivityList(self, connectivityList : list[(int,int)]):
+        self._connectivityList = connectivityList
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        self._xy = self._distances = None
+        self._roads = self._edge_lengths = None
+
+    @property
+    def distances(self) -> np.ndarray:
+        #[L,L] euclidean distances between locations, indexed by location id
+        xy = np.array([loc.xy for loc in self._locations], dtype = float).reshape(-1,2)
+        if self._distances is None or not np.array_equal(xy, self._xy):
+            self._distances = np.sqrt(((xy[:,None,:] - xy[None,:,:])**2).sum(axis = 2))
+            self._xy = xy
+            self._edge_lengths = None
+        return self._distances
+
+    @property
+    def edge_lengths(self) -> np.ndarray:
+        #length of every road in connectivityList, in the same order
+        distances = self.distances
+        c = np.array(self._connectivityList, dtype = int).reshape(-1,2)
+        if self._edge_lengths is None or not np.array_equal(c, self._roads):
+            self._edge_lengths = distances[c[:,0], c[:,1]]
+            self._roads = c
+        return self._edge_lengths
+
+    def distance(self, i : int, j : int) -> float:
+        return float(self.distances[i, j])
+
     def find_adjacent(self,lm : location):
         adjacent = []
         for c in self.connectivityList:
@@ -266,11 +266,7 @@ while True:
                             env.locations += [new_loc]
                     env.plot(ax)
 
-                    planner = robot_planner()
-                    planner.f_dist2charge = f_dist2charge
-                    planner.f_charge2time = f_charge2time
-                    planner.max_charge = max_charge
-                    planner.create_problem(env,r,d)
+                    planner.create_problem(env,r,d) #same planner, a fresh problem of its compiled domain
                     execution_times, actions, durations = planner.solve(engine_name = 'lpg', minimize_makespan = True, lpg_n = 2)
                     actions = parse_plan(execution_times, actions, durations,env, a)
                     a_execution_times, a_actions, a_durations = full_plan_2_per_agent(execution_times, actions, durations, a)
@@ -0,0 +1,20 @@
+from maildelivery.brains.brains_bots_and_drones import robot_planner
+from maildelivery.brains.plan_parser import parse_plan
+from city_map import build_env, spawn_agents, f_dist2charge, f_charge2time, max_charge
+
+env = build_env()
+r, d = spawn_agents(env)
+a = r + d
+
+#optic, lpg and tamer race on problem 7. engines that are not installed are skipped
+for policy in ['first', 'best']:
+    planner = robot_planner()
+    planner.f_dist2charge = f_dist2charge
+    planner.f_charge2time = f_charge2time
+    planner.max_charge = max_charge
+    planner.create_problem(env,r,d, backWithCharge = True)
+
+    execution_times, actions, durations = planner.solve(engine_name = 'portfolio', lpg_n = 3, \
+                                                        deadline = 30.0, portfolio_policy = policy)
+    actions = parse_plan(execution_times, actions, durations, env, a)
+    print(f"{policy}: plan should end at {max([action.time_end for action in actions])}")
@@ -0,0 +1,25 @@
+from maildelivery.brains.brains_bots_and_drones import robot_planner
+from maildelivery.brains.plan_parser import parse_plan
+from city_map import build_env, spawn_agents, f_dist2charge, f_charge2time, max_charge
+
+env = build_env()
+r, d = spawn_agents(env)
+a = r + d
+
+planner = robot_planner()
+planner.f_dist2charge = f_dist2charge
+planner.f_charge2time = f_charge2time
+planner.max_charge = max_charge
+planner.create_problem(env,r,d, backWithCharge = True)
+
+#dispatch could start on the first plan while lpg keeps improving it
+GOOD_ENOUGH = 25.0
+def on_incumbent(inc):
+    actions = parse_plan(inc.execution_times, inc.actions, inc.durations, env, a)
+    print(f"{inc}, first action: {actions[0]}")
+    return inc.makespan < GOOD_ENOUGH #stop searching once the plan is good enough
+
+execution_times, actions, durations = planner.solve(engine_name = 'lpg', lpg_n = 10, deadline = 120.0, \
+                                                    on_incumbent = on_incumbent)
+actions = parse_plan(execution_times, actions, durations, env, a)
+print(f"plan should end at {max([action.time_end for action in actions])}")
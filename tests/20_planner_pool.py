@@ -0,0 +1,38 @@
+from maildelivery.brains.planner_pool import planner_pool, build_planner
+from maildelivery.brains.plan_parser import parse_plan
+from city_map import build_env, spawn_agents
+import time
+
+def f_dist2charge(dist): #the pool's options cross processes, so no lambdas
+    return 3 * dist
+
+env = build_env()
+r, d = spawn_agents(env)
+a = r + d
+
+#workers are warm once the pool is created, requests only pay for the problem and the solver
+with planner_pool(workers = 2) as pool:
+    start = time.time()
+    futures = [pool.submit(env, r, d, backWithCharge = True, engine_name = 'lpg', lpg_n = 1, deadline = 30.0) \
+                for _ in range(4)]
+    for future in futures:
+        execution_times, actions, durations = future.result()
+        actions = parse_plan(execution_times, actions, durations, env, a)
+        print(f"plan should end at {max([action.time_end for action in actions])}")
+    print(f"4 requests took {time.time() - start} seconds")
+
+#requests can plan with other charge functions and create_problem options, the worker plans what a planner would
+planner_options = {'f_dist2charge' : f_dist2charge}
+problem_options = {'reduce_map' : True}
+planner = build_planner('bots_and_drones', env, r, d, True, planner_options, problem_options)
+assert planner.reduction is not None and '(* 3 ' in planner.domain.pddl_domain
+with planner_pool(workers = 1, brains = ['bots_and_drones']) as pool:
+    execution_times, actions, durations = pool.submit(env, r, d, backWithCharge = True, planner_options = planner_options, \
+                                                      problem_options = problem_options, engine_name = 'lpg', lpg_n = 1, \
+                                                      deadline = 30.0).result()
+    print(f"reduced map and 3x discharge: {len(actions)} actions")
+    try:
+        pool.submit(env, r, d, planner_options = {'velocity' : 2.0})
+        assert False, 'velocity is not a planner option'
+    except ValueError as e:
+        print(e)
@@ -0,0 +1,44 @@
+from maildelivery.world import enviorment, location, package
+from maildelivery.agents import robot
+from maildelivery.brains.region_planner import region_planner, collisions
+from maildelivery.brains.plan_parser import parse_plan
+from maildelivery.geometry import pose2
+import numpy as np
+import time
+
+DT = 0.001 #[s]
+V = 1.0 #[m/s]
+W, H = 6, 4 #grid of intersections
+D = 3.0 #[m]
+
+locations = [location(y * W + x, np.array([D * x, D * y]), 'dock' if (x,y) in [(0,0), (W-1,H-1)] else 'intersection') \
+                for y in range(H) for x in range(W)]
+connectivityList = [(y * W + x, y * W + x + 1) for y in range(H) for x in range(W-1)] + \
+                    [(y * W + x, (y+1) * W + x) for y in range(H-1) for x in range(W)]
+packages = [package(i, a, 'location', b, 0.0, locations[a].xy) for i, (a, b) in enumerate([(1,4), (7,22), (20,2), (15,9)])]
+env = enviorment(locations, connectivityList, packages)
+
+robots = []
+for i, l in enumerate([0, W-1, (H-1) * W, H * W - 1]):
+    r = robot(i, pose2(locations[l].xy[0], locations[l].xy[1], np.pi/2), DT)
+    r.last_location = r.goal_location = l
+    r.velocity = V
+    r.charge = 100.0
+    r.return_charge = 0.0
+    robots.append(r)
+
+#four regions around the robots, packages crossing them are handed off on the borders
+start = time.time()
+with region_planner('bots_simple', regions = 4) as planner:
+    execution_times, actions, durations = planner.solve(env, robots, engine_name = 'lpg', lpg_n = 1, deadline = 10.0)
+    print(f"regions:\n{planner.region.reshape(H,W)}\n{len(planner.phases)} phases took {time.time() - start} seconds")
+
+    #the pool of the first solve is kept, solving again skips warming it up
+    pool = planner.pool
+    start = time.time()
+    planner.solve(env, robots, engine_name = 'lpg', lpg_n = 1, deadline = 10.0)
+    assert planner.pool is pool
+    print(f"solving again took {time.time() - start} seconds")
+print(f"collisions: {collisions(execution_times, actions, durations, robots)}")
+actions = parse_plan(execution_times, actions, durations, env, robots)
+print(f"plan should end at {max([action.time_end for action in actions])}")
@@ -0,0 +1,39 @@
+from maildelivery.world import enviorment, location, package
+from maildelivery.agents import robot
+from maildelivery.brains.allocation import allocation_planner
+from maildelivery.brains.region_planner import collisions
+from maildelivery.brains.plan_parser import parse_plan
+from maildelivery.geometry import pose2
+import numpy as np
+import time
+
+DT = 0.001 #[s]
+V = 1.0 #[m/s]
+W, H = 6, 4 #grid of intersections
+D = 3.0 #[m]
+
+locations = [location(y * W + x, np.array([D * x, D * y]), 'dock' if (x,y) in [(0,0), (W-1,H-1)] else 'intersection') \
+                for y in range(H) for x in range(W)]
+connectivityList = [(y * W + x, y * W + x + 1) for y in range(H) for x in range(W-1)] + \
+                    [(y * W + x, (y+1) * W + x) for y in range(H-1) for x in range(W)]
+packages = [package(i, a, 'location', b, 0.0, locations[a].xy) for i, (a, b) in enumerate([(1,4), (7,22), (20,2), (15,9), (10,13), (3,21)])]
+env = enviorment(locations, connectivityList, packages)
+
+robots = []
+for i, l in enumerate([0, W-1, (H-1) * W, H * W - 1]):
+    r = robot(i, pose2(locations[l].xy[0], locations[l].xy[1], np.pi/2), DT)
+    r.last_location = r.goal_location = l
+    r.velocity = V
+    r.charge = 100.0
+    r.return_charge = 0.0
+    robots.append(r)
+
+#packages are allocated to robots up front, then every robot is planned on its own and the plans merged
+for method in ['auction', 'matching']:
+    start = time.time()
+    with allocation_planner('bots_charge_added', method = method) as planner:
+        execution_times, actions, durations = planner.solve(env, robots, engine_name = 'lpg', lpg_n = 1, deadline = 10.0)
+    print(f"{method}: {planner.assignment} took {time.time() - start} seconds")
+    print(f"collisions: {collisions(execution_times, actions, durations, robots)}")
+    parsed = parse_plan(execution_times, actions, durations, env, robots)
+    print(f"plan should end at {max([action.time_end for action in parsed])}")
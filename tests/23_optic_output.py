@@ -0,0 +1,45 @@
+from maildelivery.binary_solvers.optic.optic_wrapper import plan_blocks, get_plan_from_lines
+
+#stdout of an anytime optic run: two improving plans, then the final plan repeated once the search is done
+OUTPUT = '''Number of literals: 14
+Constructing lookup tables: [10%] [20%] [30%] [40%] [50%] [60%] [70%] [80%] [90%] [100%]
+Initial heuristic = 6.000
+b (5.000 | 2.001)b (4.000 | 4.002)b (2.000 | 6.003)b (1.000 | 8.004)
+; Plan found with metric 10.005
+; States evaluated so far: 23
+; Time 0.02
+0.000: (move r0 l0 l1)  [2.000]
+2.001: (pickup p0 r0 l1)  [1.000]
+3.002: (move r0 l1 l2)  [2.000]
+5.003: (move r0 l2 l3)  [2.000]
+7.004: (drop p0 r0 l3)  [3.000]
+
+ * All goal deadlines now no later than 10.005
+b (4.000 | 2.001)b (1.000 | 6.003)
+; Plan found with metric 8.004
+; States evaluated so far: 41
+; Time 0.05
+0.000: (move r0 l0 l1)  [2.000]
+2.001: (pickup p0 r0 l1)  [1.000]
+3.002: (move r0 l1 l3)  [2.000]
+5.003: (drop p0 r0 l3)  [3.000]
+
+ * All goal deadlines now no later than 8.004
+;;;; Solution Found
+; States evaluated: 57
+; Cost: 8.004
+; Time 0.08
+0.000: (move r0 l0 l1)  [2.000]
+2.001: (pickup p0 r0 l1)  [1.000]
+3.002: (move r0 l1 l3)  [2.000]
+5.003: (drop p0 r0 l3)  [3.000]
+'''
+
+blocks = list(plan_blocks(OUTPUT.splitlines(keepends = True)))
+for block, metric in blocks:
+    execution_times, actions, durations = get_plan_from_lines(block)
+    print(f"metric {metric}: {actions}")
+
+#every plan keeps the metric printed before it, and the repeated final plan is not a new incumbent
+assert [metric for _, metric in blocks] == [10.005, 8.004]
+assert [len(block) for block, _ in blocks] == [5, 4]
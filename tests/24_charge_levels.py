@@ -0,0 +1,47 @@
+from maildelivery.world import enviorment, location, package
+from maildelivery.agents import robot, move, chargeup
+from maildelivery.brains.brains_bots_charge_added import robot_planner
+from maildelivery.brains.plan_parser import parse_plan
+from maildelivery.geometry import pose2
+import numpy as np
+import time
+
+DT = 0.001 #[s]
+V = 1.0 #[m/s]
+W, H = 3, 2 #grid of intersections
+D = 3.0 #[m], a road drains 6 of 100 charge
+
+locations = [location(y * W + x, np.array([D * x, D * y]), 'dock' if (x,y) in [(0,0), (W-1,H-1)] else 'intersection') \
+                for y in range(H) for x in range(W)]
+connectivityList = [(y * W + x, y * W + x + 1) for y in range(H) for x in range(W-1)] + \
+                    [(y * W + x, (y+1) * W + x) for y in range(H-1) for x in range(W)]
+packages = [package(0, 1, 'location', 5, 0.0, locations[1].xy)]
+env = enviorment(locations, connectivityList, packages)
+
+#not enough charge to deliver and come back with return_charge, the robot has to charge up on the way
+r0 = robot(0, pose2(locations[0].xy[0], locations[0].xy[1], np.pi/2), DT)
+r0.last_location = r0.goal_location = 0
+r0.velocity = V
+r0.charge = 40.0
+r0.return_charge = 30.0
+robots = [r0]
+
+#numeric charge, then charge in levels. lpg handles the numeric charge well, levels are for solvers that don't
+for levels in [None, 10, 100]:
+    planner = robot_planner()
+    planner.create_problem(env, robots, backWithCharge = True, charge_levels = levels)
+    start = time.time()
+    execution_times, actions, durations = planner.solve(engine_name = 'lpg', lpg_n = 1, deadline = 30.0, lpg_seeds = 4)
+    print(f"levels {levels}: {len(actions)} actions, took {time.time() - start} seconds")
+    parsed = parse_plan(execution_times, actions, durations, env, robots)
+
+    #a plan on levels is a plan on the real charge
+    charge = r0.charge
+    for a in sorted(parsed, key = lambda a: a.time_start):
+        if type(a) == move:
+            charge -= planner.f_dist2charge(np.linalg.norm(a.loc_to.xy - a.loc_from.xy))
+            assert charge >= 0.0, f"{a} drives the robot flat"
+        elif type(a) == chargeup:
+            charge = planner.max_charge
+    assert charge >= r0.return_charge, f"robot is back with {charge}"
+    print(f"robot is back with charge {charge}")
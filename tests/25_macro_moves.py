@@ -0,0 +1,88 @@
+from maildelivery.brains.brains_bots_and_drones import robot_planner
+from maildelivery.brains.plan_parser import parse_plan
+from maildelivery.brains import grounding
+from maildelivery.binary_solvers import telemetry
+from city_map import build_env, spawn_agents, f_dist2charge, f_charge2time, max_charge
+import time
+
+env = build_env()
+r, d = spawn_agents(env)
+a = r + d
+roads = {tuple(c) for c in env.connectivityList} | {tuple(c[::-1]) for c in env.connectivityList}
+
+def delivered(actions, env):
+    #packages whose last drop is at their goal
+    drops = {int(x[1][1:]) : int(x[3][1:]) for x in actions if x[0] == 'drop'}
+    return {p.id for p in env.packages if drops.get(p.id, p.owner if p.owner_type == 'location' else None) == p.goal}
+
+#robots drive paths between key locations in one action, reserving the locations and roads they pass.
+#the city map has four houses on every block, paths are short and macros only make the plan longer
+results = {}
+for macros in [False, True]:
+    planner = robot_planner()
+    planner.f_dist2charge = f_dist2charge
+    planner.f_charge2time = f_charge2time
+    planner.max_charge = max_charge
+    planner.create_problem(env, r, d, backWithCharge = True, macro_moves = macros)
+    report = grounding.analyze(planner)
+    print(report)
+    assert report.init_facts <= grounding.grounding_limits().init_facts #lpg's MAX_INITIAL
+
+    start = time.time()
+    execution_times, actions, durations = planner.solve(engine_name = 'lpg', lpg_n = 1, deadline = 60.0, lpg_seeds = [1])
+    took = time.time() - start
+    print(f"took {took} seconds, {len(planner.last_result.plan()[1])} actions planned")
+
+    #solve() returns the moves along the paths, and the plan delivers every package
+    assert all((int(x[2][1:]), int(x[3][1:])) in roads for x in actions if x[0] == 'move')
+    assert delivered(actions, env) == {p.id for p in env.packages}
+    parsed = parse_plan(execution_times, actions, durations, env, a)
+    results[macros] = (report.ground_actions, took, max([action.time_end for action in parsed]))
+
+print(f"city map, moves: {results[False][0]:.0f} ground actions, took {results[False][1]:.2f} seconds, makespan {results[False][2]}")
+print(f"city map, macros: {results[True][0]:.0f} ground actions, took {results[True][1]:.2f} seconds, makespan {results[True][2]}")
+#no shorter search for a plan that is no better
+assert results[True][2] >= results[False][2]
+
+#where macros pay off: key locations far apart with intersections between them. a 9x9 grid of intersections with
+#houses on the corners and in the middle, plain moves against macros, over three lpg seeds
+from maildelivery.world import enviorment, location, package
+from maildelivery.agents import robot
+from maildelivery.geometry import pose2
+from maildelivery.brains.brains_bots_simple import robot_planner as simple_planner
+import numpy as np
+
+G, D = 9, 3.0
+c = lambda x, y: y * G + x
+houses = {c(0,0), c(G-1,0), c(0,G-1), c(G-1,G-1), c(G//2,G//2)}
+locations = [location(c(x,y), np.array([D * x, D * y]), 'house' if c(x,y) in houses else 'intersection') \
+                for y in range(G) for x in range(G)]
+connectivityList = [(c(x,y), c(x+1,y)) for y in range(G) for x in range(G-1)] + \
+                    [(c(x,y), c(x,y+1)) for y in range(G-1) for x in range(G)]
+packages = [package(k, a, 'location', b, 0.0, locations[a].xy) for k, (a, b) in \
+            enumerate([(c(0,0), c(G-1,G-1)), (c(G-1,0), c(0,G-1)), (c(G//2,G//2), c(0,0)), (c(0,G-1), c(G//2,G//2))])]
+grid = enviorment(locations, connectivityList, packages)
+bots = []
+for k, l in enumerate([c(0,0), c(G-1,G-1)]):
+    bot = robot(k, pose2(locations[l].xy[0], locations[l].xy[1], np.pi/2), 0.001)
+    bot.last_location = bot.goal_location = l
+    bot.velocity = 1.0
+    bots.append(bot)
+
+grid_actions = {}
+for macros in [False, True]:
+    planner = simple_planner()
+    planner.create_problem(grid, bots, macro_moves = macros)
+    times, makespans = [], []
+    for seed in [1, 2, 3]:
+        start = time.time()
+        execution_times, actions, durations = planner.solve(engine_name = 'lpg', lpg_n = 1, deadline = 60.0, \
+                                                            lpg_seeds = [seed], telemetry_sink = telemetry.null_sink)
+        times.append(round(time.time() - start, 2))
+        makespans.append(planner.last_result.makespan)
+        assert delivered(actions, grid) == {p.id for p in grid.packages}
+    grid_actions[macros] = grounding.analyze(planner).ground_actions
+    print(f"grid, {'macros' if macros else 'moves'}: {grid_actions[macros]:.0f} ground actions, "
+          f"took {times} seconds, makespans {makespans}")
+#fewer actions to ground and search on, for plans delivering every package
+assert grid_actions[True] < grid_actions[False]
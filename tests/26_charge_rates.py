@@ -0,0 +1,32 @@
+from maildelivery.brains.brains_bots_charge_added import robot_planner
+
+def discharge(rate):
+    return lambda dist: rate * dist
+
+#planners differing only in the rate their lambda closes over compile domains of their own
+planners = []
+for rate in [2, 5]:
+    planner = robot_planner()
+    planner.f_dist2charge = discharge(rate)
+    planner.create_domain()
+    planners.append(planner)
+    print(f"rate {rate}: {[l.strip() for l in planner.domain.pddl_domain.splitlines() if '(* ' in l][:1]}")
+assert planners[0].domain is not planners[1].domain
+assert '(* 2 ' in planners[0].domain.pddl_domain and '(* 5 ' in planners[1].domain.pddl_domain
+assert '(* 2 ' not in planners[1].domain.pddl_domain
+
+#the same rate shares the domain, so do the default lambdas every planner creates again
+again = robot_planner()
+again.f_dist2charge = discharge(5)
+again.create_domain()
+assert again.domain is planners[1].domain
+assert robot_planner().domain is robot_planner().domain
+
+#and so do charge levels
+for levels in [10, 100]:
+    a, b = robot_planner(), robot_planner()
+    b.f_dist2charge = discharge(5)
+    a.create_domain(a.FEATURES | {'charge_levels'}, levels)
+    b.create_domain(b.FEATURES | {'charge_levels'}, levels)
+    assert a.domain is not b.domain and a.domain.levels.key != b.domain.levels.key
+print("domains are keyed on the charge rates")
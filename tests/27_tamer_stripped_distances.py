@@ -0,0 +1,59 @@
+from maildelivery.world import enviorment,location, package
+from maildelivery.agents import robot
+from maildelivery.brains.brains_bots_simple import robot_planner
+from maildelivery.brains import pddl_emitter
+from maildelivery.brains.domain_generator import NOT_CONNECTED_DISTANCE
+from maildelivery.binary_solvers.workspace import workspace
+from maildelivery.binary_solvers.tamer import tamer_wrapper
+from maildelivery.binary_solvers import portfolio
+from maildelivery.geometry import pose2
+
+import importlib.util
+import numpy as np
+from unified_planning.io.pddl_reader import PDDLReader
+from unified_planning.exceptions import UPProblemDefinitionError
+
+#the map of problem 1 (05_problem_1.py)
+locations = sorted([location(0,np.array([0,0]),'dock'),
+                    location(1,np.array([1,0]),'intersection'), location(2,np.array([2,0]),'intersection'),
+                    location(3,np.array([1,1]),'intersection'), location(4,np.array([2,1]),'intersection'),
+                    location(5,np.array([1,2]),'house'), location(6,np.array([2,2]),'house')])
+packages = [package(0,5,'location',6,100,locations[5].xy), package(1,6,'location',5,100,locations[6].xy)]
+env = enviorment(locations, [[0,1],[1,2],[2,4],[3,4],[1,3],[3,5],[4,6]], packages)
+r = robot(0, pose2(0,0,0), 0.001)
+r.last_location = 0
+r.goal_location = 0
+r.velocity = 2.0
+
+#the problem optic and lpg get, without the distances of unconnected pairs.
+#no metric, some pyparsing versions break unified_planning's reading of (total-time)
+planner = robot_planner()
+planner.create_problem(env,[r])
+problem = pddl_emitter.emit_problem(planner.domain, **planner.problem_args, minimize_makespan = False, \
+                                    omit = {'distance' : NOT_CONNECTED_DISTANCE})
+ws = workspace()
+ws.write_pddls(planner.domain.pddl_domain, problem)
+
+#unified_planning refuses it as is, tamer_wrapper gives the missing distances back
+parsed = PDDLReader().parse_problem(ws.domain_path, ws.problem_path)
+try:
+    parsed.initial_values
+    assert False, 'the stripped problem should leave distances undefined'
+except UPProblemDefinitionError:
+    pass
+tamer_wrapper.set_defaults(parsed, {'distance' : NOT_CONNECTED_DISTANCE})
+distances = [v for f, v in parsed.initial_values.items() if f.fluent().name == 'distance']
+assert len(distances) == len(locations)**2
+assert sum(float(v.constant_value()) == NOT_CONNECTED_DISTANCE for v in distances) == \
+        len(locations)**2 - 2 * len(env.connectivityList)
+print(f"{len(distances)} distances after set_defaults")
+
+#the portfolio's tamer leg solves the stripped problem
+if importlib.util.find_spec('up_tamer') is None:
+    print("up_tamer is not installed, skipping the tamer leg")
+else:
+    result = portfolio.solve(ws, engines = ('tamer',), deadline = 60.0, \
+                                tamer_defaults = {'distance' : NOT_CONNECTED_DISTANCE})
+    print(result)
+    assert result.found and result.engine == 'tamer'
+ws.cleanup()
@@ -0,0 +1,59 @@
+from maildelivery.binary_solvers import portfolio, process
+from maildelivery.binary_solvers.workspace import workspace
+from maildelivery.binary_solvers.result import incumbent
+
+import time
+
+#engines are sleeps with a timeout of their own here, so the race only depends on how it ends, not on a solver
+def start_sleep(engine_name, ws, lpg_n = 3, memory_limit = None, deadline = None, seed = None, tamer_defaults = None):
+    return process.start(['sleep', '3'], cwd = ws.dir, timeout = 0.5)
+
+def broken_incumbents(engine_name, ws, p, metric_cutoff = None):
+    raise ValueError('plan does not parse')
+    yield
+
+def no_incumbents(engine_name, ws, p, metric_cutoff = None):
+    process.wait(p)
+    yield from []
+
+portfolio.start_engine = start_sleep
+
+#a reader that fails still ends its run, without a deadline the race would wait forever
+portfolio.incumbents = broken_incumbents
+with workspace() as ws:
+    t = time.time()
+    r = portfolio.solve(ws, engines = ('optic', 'lpg'))
+    print(f"broken readers: {r.status} after {time.time() - t:.2f} seconds")
+    assert r.status == 'error' and len(r.stats['failed']) == 2 and time.time() - t < 0.5
+
+#engines that all stop on their own timeout did not prove there is no plan
+portfolio.incumbents = no_incumbents
+with workspace() as ws:
+    r = portfolio.solve(ws, engines = ('optic', 'lpg'))
+    print(f"engines timed out: {r.status}")
+    assert r.status == 'timeout'
+
+#lpg seeds race the same way, every seed is a run of its own
+portfolio.incumbents = broken_incumbents
+with workspace() as ws:
+    r = portfolio.solve(ws, engines = ('lpg',), lpg_seeds = 2)
+    print(f"broken lpg seeds: {r.status}, failed {sorted(r.stats['failed'])}")
+    assert r.engine == 'lpg' and r.status == 'error' and sorted(r.stats['failed']) == ['lpg_seed1', 'lpg_seed2']
+
+#a best plan while other runs were cut off by the deadline is marked, robot_planner.solve doesn't cache it
+def start_fast_optic(engine_name, ws, lpg_n = 3, memory_limit = None, deadline = None, seed = None, tamer_defaults = None):
+    return process.start(['sleep', '0.1' if engine_name == 'optic' else '3'], cwd = ws.dir, timeout = deadline)
+
+def optic_plans(engine_name, ws, p, metric_cutoff = None):
+    process.wait(p)
+    if engine_name == 'optic':
+        yield incumbent('optic', 1, 0.1, [0.0], [('move', 'r0', 'l0', 'l1')], [1.0])
+
+portfolio.start_engine = start_fast_optic
+portfolio.incumbents = optic_plans
+with workspace() as ws:
+    r = portfolio.solve(ws, engines = ('optic', 'lpg'), deadline = 0.5)
+    print(f"lpg cut off: {r}, cut off {r.stats.get('cut_off')}")
+    assert r.status == 'solved' and r.stats['cut_off'] == ['lpg']
+    r = portfolio.solve(ws, engines = ('optic', 'lpg'), deadline = 0.5, policy = 'first')
+    assert 'cut_off' not in r.stats
@@ -0,0 +1,16 @@
+from maildelivery.binary_solvers import process
+
+import subprocess
+import sys
+
+#the memory limit is in place before the solver runs, and running out of it is reported as such
+ALLOCATE = 'import resource; print(resource.getrlimit(resource.RLIMIT_AS)[0] >> 20); x = bytearray(400 * 2**20)'
+p = process.start([sys.executable, '-c', ALLOCATE], stdout = subprocess.PIPE, memory_limit = 200)
+limit = int(p.stdout.read())
+status = process.status(p, False)
+print(f"limit seen by the solver {limit} MB, status {status}")
+assert limit == 200 and status == 'oom'
+
+#other messages about memory are not out of memory
+p = process.start(['sh', '-c', 'echo "Switch to lowmemory mode..." >&2; exit 1'], memory_limit = 200)
+assert process.status(p, False) == 'unsolvable' and not p.out_of_memory_reported
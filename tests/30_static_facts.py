@@ -0,0 +1,49 @@
+from maildelivery.brains.brains_bots_and_drones import robot_planner
+from maildelivery.brains import pddl_emitter
+from maildelivery.brains.domain_generator import NOT_CONNECTED_DISTANCE
+from city_map import build_env, spawn_agents, f_dist2charge, f_charge2time, max_charge
+
+env = build_env()
+r, d = spawn_agents(env)
+omit = {'distance' : NOT_CONNECTED_DISTANCE}
+
+#fluents whose static facts are built again, every emit
+rebuilt = []
+static_values = pddl_emitter.static_values
+def watch(domain, env, robots, drones = [], names = None):
+    rebuilt.append(sorted(names))
+    return static_values(domain, env, robots, drones, names)
+pddl_emitter.static_values = watch
+
+def emit(macro_moves = False):
+    planner = robot_planner()
+    planner.f_dist2charge = f_dist2charge
+    planner.f_charge2time = f_charge2time
+    planner.max_charge = max_charge
+    planner.create_problem(env, r, d, backWithCharge = True, macro_moves = macro_moves)
+    rebuilt.clear()
+    problem = pddl_emitter.emit_problem(planner.domain, **planner.problem_args, omit = omit)
+    #the same as written without any cache
+    pddl_emitter.clear_cache()
+    assert problem == pddl_emitter.emit_problem(planner.domain, **planner.problem_args, omit = omit)
+    return sum(rebuilt[:-1], []) #those of the first emit
+
+for macros in [False, True]:
+    pddl_emitter.clear_cache()
+    print(f"macros {macros}, first emit builds {emit(macros)}")
+    #a replan after a robot moved, the flights it can be lifted on stay the same
+    station = r[0].last_location
+    r[0].last_location = 4
+    again = emit(macros)
+    print(f"robot moved, built again {again}")
+    assert again == ([] if not macros else [f for f in again if f.startswith('path')])
+    r[0].last_location = station
+
+#a closed road that disconnects nothing only builds again the fluents made of roads
+emit()
+roads = env.connectivityList
+env.connectivityList = roads[:4] + roads[5:] #a side of the first block
+again = emit()
+print(f"road closed, built again {again}")
+assert again == ['distance', 'is_connected']
+env.connectivityList = roads